@@ -0,0 +1,219 @@
+import argparse
+import contextlib
+import hashlib
+import itertools
+import json
+import os
+import re
+import tempfile
+import time
+
+from risk_levels import map_score_to_level
+
+CHECKPOINT_FILE = "checkpoint.json"
+CHECKPOINT_VERSION = 1
+# atomic_open 为分块文件和检查点创建的临时文件名：.<文件名>.<随机串>.tmp
+RUN_TEMP_FILE_PATTERN = re.compile(r"\.(?:part-\d+\.jsonl|" + re.escape(CHECKPOINT_FILE) + r")\.\w+\.tmp")
+
+
+@contextlib.contextmanager
+def atomic_open(path, mode="w", encoding="utf-8", newline=None):
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix="." + os.path.basename(path) + ".", suffix=".tmp", dir=directory)
+    try:
+        if "b" in mode:
+            encoding = None
+        with os.fdopen(fd, mode, encoding=encoding, newline=newline) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def atomic_write_text(path, text):
+    with atomic_open(path) as f:
+        f.write(text)
+
+
+def iter_jsonl(path, start_offset=0):
+    with open(path, "r", encoding="utf-8") as f:
+        lines = (line for line in f if line.strip())
+        for line in itertools.islice(lines, start_offset, None):
+            yield json.loads(line)
+
+
+def file_fingerprint(path):
+    stat = os.stat(path)
+    return f"{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def assess_item(evaluator, item):
+    try:
+        assessment = evaluator.assess(
+            item_text=item.get("item_text", ""),
+            item_metadata=item.get("item_metadata"),
+            historical_texts=item.get("historical_texts"),
+            similar_item_texts=item.get("similar_item_texts"),
+            item_id=item.get("id"),
+        )
+        risk_level = map_score_to_level(assessment["overall_score"])
+    except Exception as e:
+        print(f"错误：评估物品 '{item.get('name')}' 时出错: {e}")
+        assessment = {'overall_score': 0, 'dimension_risks': {}, 'risk_labels': [f'评估出错: {e}'], 'raw_sentiment': None}
+        risk_level = "high"
+    row = {"id": item.get("id"), "name": item.get("name")}
+    row.update(assessment)
+    row["risk_level"] = risk_level
+    return row
+
+
+class BatchRun:
+
+    def __init__(self, evaluator, output_dir, input_fingerprint, chunk_size=500, restart=False, pool=None):
+        self.evaluator = evaluator
+        self.pool = pool
+        self.output_dir = output_dir
+        self.input_fingerprint = input_fingerprint
+        self.chunk_size = chunk_size
+        self.config_fingerprint = evaluator.config_fingerprint()
+        self.checkpoint_path = os.path.join(output_dir, CHECKPOINT_FILE)
+        os.makedirs(output_dir, exist_ok=True)
+        self._remove_stale_temp_files()
+        self.checkpoint = self._load_checkpoint(restart)
+
+    def _new_checkpoint(self):
+        return {
+            "version": CHECKPOINT_VERSION,
+            "config_fingerprint": self.config_fingerprint,
+            "input_fingerprint": self.input_fingerprint,
+            "offset": 0,
+            "last_item_id": None,
+            "chunks": [],
+            "completed": False,
+            "updated_at": time.time(),
+        }
+
+    def _remove_stale_temp_files(self):
+        for name in os.listdir(self.output_dir):
+            if RUN_TEMP_FILE_PATTERN.fullmatch(name):
+                os.unlink(os.path.join(self.output_dir, name))
+
+    def _load_checkpoint(self, restart):
+        if not os.path.exists(self.checkpoint_path):
+            return self._new_checkpoint()
+        with open(self.checkpoint_path, "r", encoding="utf-8") as f:
+            checkpoint = json.load(f)
+        if restart:
+            for chunk in checkpoint.get("chunks", []):
+                chunk_path = os.path.join(self.output_dir, chunk["file"])
+                if os.path.exists(chunk_path):
+                    os.unlink(chunk_path)
+            return self._new_checkpoint()
+        if checkpoint.get("config_fingerprint") != self.config_fingerprint:
+            raise ValueError(f"评估器配置已变化 ({checkpoint.get('config_fingerprint')} -> {self.config_fingerprint})，"
+                             f"无法从 {self.output_dir} 续跑，请使用新的输出目录或 --restart")
+        if checkpoint.get("input_fingerprint") != self.input_fingerprint:
+            raise ValueError(f"输入数据已变化，无法从 {self.output_dir} 续跑，请使用新的输出目录或 --restart")
+        return checkpoint
+
+    @property
+    def offset(self):
+        return self.checkpoint["offset"]
+
+    @property
+    def last_item_id(self):
+        return self.checkpoint["last_item_id"]
+
+    @property
+    def completed(self):
+        return self.checkpoint["completed"]
+
+    def run(self, items):
+        if self.completed:
+            print(f"批量评估已完成（共 {self.offset} 个物品），跳过。")
+            return self.checkpoint
+
+        if self.offset:
+            print(f"从检查点续跑：已完成 {self.offset} 个物品，{len(self.checkpoint['chunks'])} 个输出分块。")
+        iterator = iter(items)
+        while True:
+            batch = list(itertools.islice(iterator, self.chunk_size))
+            if not batch:
+                break
+            if self.pool is not None:
+                rows = self.pool.map(batch)
+            else:
+                rows = [assess_item(self.evaluator, item) for item in batch]
+            self._commit_chunk(rows, batch[-1].get("id"))
+            print(f"  已评估 {self.offset} 个物品")
+
+        self.checkpoint["completed"] = True
+        self._save_checkpoint()
+        print(f"批量评估完成，共 {self.offset} 个物品。")
+        return self.checkpoint
+
+    def _commit_chunk(self, rows, last_item_id):
+        chunk_file = f"part-{len(self.checkpoint['chunks']):05d}.jsonl"
+        text = "".join(json.dumps(row, ensure_ascii=False) + "\n" for row in rows)
+        atomic_write_text(os.path.join(self.output_dir, chunk_file), text)
+
+        self.checkpoint["chunks"].append({
+            "file": chunk_file,
+            "start_offset": self.offset,
+            "count": len(rows),
+            "sha256": hashlib.sha256(text.encode("utf-8")).hexdigest(),
+        })
+        self.checkpoint["offset"] += len(rows)
+        self.checkpoint["last_item_id"] = last_item_id
+        self._save_checkpoint()
+
+    def _save_checkpoint(self):
+        self.checkpoint["updated_at"] = time.time()
+        atomic_write_text(self.checkpoint_path, json.dumps(self.checkpoint, ensure_ascii=False, indent=2))
+
+    def iter_results(self):
+        for chunk in self.checkpoint["chunks"]:
+            yield from iter_jsonl(os.path.join(self.output_dir, chunk["file"]))
+
+
+def run_store_batch(evaluator, store, output_dir, chunk_size=500, restart=False, pool=None):
+    run = BatchRun(evaluator, output_dir, store.input_fingerprint(), chunk_size, restart, pool)
+    return run.run(store.iter_items(cursor=run.last_item_id or 0))
+
+
+def run_jsonl_batch(evaluator, input_path, output_dir, chunk_size=500, restart=False, pool=None):
+    run = BatchRun(evaluator, output_dir, file_fingerprint(input_path), chunk_size, restart, pool)
+    return run.run(iter_jsonl(input_path, run.offset))
+
+
+if __name__ == "__main__":
+    from product_store import ProductStore, DEFAULT_DB_PATH
+    from text_risk_evaluator import TextRiskEvaluator
+    from worker_pool import WarmWorkerPool
+
+    parser = argparse.ArgumentParser(description="可断点续跑的批量文本风险评估")
+    parser.add_argument("output_dir", help="输出目录（分块结果和检查点）")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help="产品数据库路径")
+    parser.add_argument("--input", help="JSONL 输入文件（指定后不读数据库）")
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--restart", action="store_true", help="丢弃已有检查点重新开始")
+    parser.add_argument("--workers", type=int, default=0, help="预热工作进程数（0 表示在当前进程内评估）")
+    parser.add_argument("--max-tasks-per-worker", type=int, default=1000)
+    parser.add_argument("--max-worker-rss-mb", type=int, help="工作进程常驻内存超过该值后重启")
+    args = parser.parse_args()
+
+    evaluator = TextRiskEvaluator()
+    pool = WarmWorkerPool(evaluator, args.workers, args.max_tasks_per_worker, args.max_worker_rss_mb) if args.workers else None
+    try:
+        if args.input:
+            run_jsonl_batch(evaluator, args.input, args.output_dir, args.chunk_size, args.restart, pool)
+        else:
+            with ProductStore(args.db) as store:
+                run_store_batch(evaluator, store, args.output_dir, args.chunk_size, args.restart, pool)
+    finally:
+        if pool is not None:
+            pool.close()
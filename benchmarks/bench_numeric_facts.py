@@ -0,0 +1,38 @@
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from text_analysis import NumericFactExtractor, TextAnalysis
+
+SEGMENT = ("采用最新主动降噪技术，单次充电可提供长达20小时的播放时间，支持蓝牙5.2快速连接。"
+           "This SSD reads at 5000MB/s and lasts 12 hours on battery, only $1,299.50! "
+           "读取速度高达惊人的 3500 MB/s，容量1TB，仅售 ¥599。")
+
+
+def legacy_scan(text):
+    re.findall(r'[$€£¥]\s?(\d{1,3}(?:,\d{3})*(?:\.\d{1,2})?|\d+(?:\.\d{1,2})?)', text)
+    re.findall(r'(\d{3,})\s?MB/s', text, re.IGNORECASE)
+    text.lower()
+    re.findall(r'(\d{1,2})\s?(?:小时|hours)', text)
+    re.findall(r'\b\w+\b', text.lower())
+    text.lower()
+    re.findall(r'\b\w+\b', text.lower())
+    re.findall(r'\b\d+(?:\.\d+)?\b', text)
+
+
+def fused_scan(text, extractor):
+    TextAnalysis(text, extractor)
+
+
+if __name__ == "__main__":
+    extractor = NumericFactExtractor()
+    for repeats in (10, 100, 1000):
+        text = SEGMENT * repeats
+        runs = max(3, 3000 // repeats)
+        legacy = min(timeit.repeat(lambda: legacy_scan(text), number=runs, repeat=3)) / runs
+        fused = min(timeit.repeat(lambda: fused_scan(text, extractor), number=runs, repeat=3)) / runs
+        print(f"{len(text):>8} 字符  旧实现 {legacy * 1000:8.3f} ms  单次扫描 {fused * 1000:8.3f} ms  "
+              f"加速 {legacy / fused:4.2f}x  数值事实 {len(extractor.extract(text))}")
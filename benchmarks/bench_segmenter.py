@@ -0,0 +1,60 @@
+import argparse
+import os
+import random
+import sys
+import time
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from evaluator_config import load_config
+from product_store import SAMPLE_PRODUCTS
+from segmenter import Segmenter, read_dictionary
+
+
+def synthetic_dictionary(count, seed=0, alphabet_size=6000):
+    # 按齐夫分布抽取常用汉字组成 2~5 字词，规模和字频分布接近常见的通用分词词典
+    rng = random.Random(seed)
+    alphabet = [chr(0x4e00 + i * 3) for i in range(alphabet_size)]
+    weights = [1 / (rank + 1) for rank in range(alphabet_size)]
+    words = {}
+    while len(words) < count:
+        length = rng.choices((2, 3, 4, 5), (60, 25, 12, 3))[0]
+        words["".join(rng.choices(alphabet, weights, k=length))] = rng.randint(1, 5000)
+    return words
+
+
+def bench_build(word_freqs):
+    start = time.perf_counter()
+    segmenter = Segmenter(word_freqs)
+    elapsed = time.perf_counter() - start
+    used = sum(1 for state in segmenter.trie.check if state >= 0)
+    print(f"{len(word_freqs):>8} 个词  建树 {elapsed:7.2f} 秒  双数组长度 {len(segmenter.trie.base):>9}  "
+          f"占用率 {used / len(segmenter.trie.base):.0%}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="分词器建树和分词速度基准")
+    parser.add_argument("--build-sizes", default="5000,20000,50000,200000",
+                        help="逗号分隔的合成词典规模，用于测量建树时间")
+    parser.add_argument("--dict", help="额外测量一个真实词典文件（每行“词 词频”，如 jieba 的 dict.txt）的建树时间")
+    args = parser.parse_args()
+
+    print("建树时间：")
+    for size in args.build_sizes.split(","):
+        bench_build(synthetic_dictionary(int(size)))
+    if args.dict:
+        bench_build(read_dictionary(args.dict))
+
+    start = time.perf_counter()
+    segmenter = load_config().segmenter
+    print(f"词典加载 {(time.perf_counter() - start) * 1000:.1f} ms，共 {segmenter.word_count} 个词，"
+          f"双数组长度 {len(segmenter.trie.base)}")
+
+    segment = "\n".join(product["item_text"] for product in SAMPLE_PRODUCTS)
+    for repeats in (1, 10, 100, 1000):
+        text = segment * repeats
+        runs = max(3, 1000 // repeats)
+        elapsed = min(timeit.repeat(lambda: segmenter.cut(text), number=runs, repeat=3)) / runs
+        print(f"{len(text):>8} 字符  {elapsed * 1000:8.3f} ms  {len(text) / elapsed:12,.0f} 字符/秒  "
+              f"词数 {len(segmenter.cut(text))}")
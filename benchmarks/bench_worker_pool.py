@@ -0,0 +1,64 @@
+import multiprocessing
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from product_store import SAMPLE_PRODUCTS
+from worker_pool import WARM_UP_ITEM, WarmWorkerPool, read_pss_bytes, read_rss_bytes
+
+ITEM = dict(SAMPLE_PRODUCTS[0], id=1)
+
+
+def _cold_worker(conn):
+    from batch_runner import assess_item
+    from text_risk_evaluator import TextRiskEvaluator
+    evaluator = TextRiskEvaluator()
+    conn.send((assess_item(evaluator, ITEM)["overall_score"], read_rss_bytes(), read_pss_bytes()))
+    conn.close()
+
+
+def cold_spawn(count):
+    context = multiprocessing.get_context("spawn")
+    start = time.perf_counter()
+    pipes = []
+    for _ in range(count):
+        parent_conn, child_conn = context.Pipe()
+        process = context.Process(target=_cold_worker, args=(child_conn,))
+        process.start()
+        pipes.append((process, parent_conn))
+    first = None
+    stats = []
+    for process, conn in pipes:
+        stats.append(conn.recv())
+        first = first if first is not None else time.perf_counter() - start
+        process.join()
+    return first, time.perf_counter() - start, stats
+
+
+def _mb(value):
+    return f"{value / 1024 / 1024:7.1f} MB" if value is not None else "    n/a"
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+
+    first, total, stats = cold_spawn(count)
+    print(f"spawn 冷启动 {count} 个进程：首个结果 {first * 1000:8.1f} ms，全部完成 {total * 1000:8.1f} ms")
+    for _, rss, pss in stats:
+        print(f"  RSS {_mb(rss)}  PSS {_mb(pss)}")
+
+    from text_risk_evaluator import TextRiskEvaluator
+    evaluator = TextRiskEvaluator()
+    evaluator.assess(**{key: value for key, value in WARM_UP_ITEM.items() if key not in ("id", "name")})
+    start = time.perf_counter()
+    with WarmWorkerPool(evaluator, count, warm_up=False) as pool:
+        spawned = time.perf_counter() - start
+        pool.map([ITEM])
+        first = time.perf_counter() - start
+        pool.map([dict(ITEM, id=i) for i in range(count * 4)])
+        print(f"fork 预热池 {count} 个进程：创建 {spawned * 1000:8.1f} ms，首个结果 {first * 1000:8.1f} ms")
+        print(f"  父进程 RSS {_mb(read_rss_bytes())}  PSS {_mb(read_pss_bytes())}")
+        for stat in pool.worker_stats():
+            print(f"  工作进程 {stat['pid']}  RSS {_mb(stat['rss_bytes'])}  PSS {_mb(stat['pss_bytes'])}")
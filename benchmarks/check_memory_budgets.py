@@ -0,0 +1,79 @@
+import argparse
+import json
+import math
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from load_test import synthetic_items
+from memory_profile import measure_run
+
+BUDGETS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "memory_budgets.json")
+# 预算下限：避免测量值接近 0 时容差失去意义
+MIN_BUDGETS = {
+    "peak_traced_mb": 1.0,
+    "retained_traced_mb": 0.5,
+    "steady_traced_growth_kb_per_1k": 64.0,
+    "rss_peak_growth_mb": 8.0,
+    "steady_rss_growth_kb_per_1k": 256.0,
+}
+
+
+def run_size(evaluator, size, traced):
+    return measure_run(evaluator, synthetic_items(size + 50, seed=size), sample_every=max(1, size // 20), traced=traced)
+
+
+def check(measured, budget, tolerance):
+    failures = []
+    for metric, limit in budget.items():
+        if metric == "traced" or metric not in measured:
+            continue
+        allowed = limit * (1 + tolerance)
+        status = "通过" if measured[metric] <= allowed else "超出"
+        print(f"    {metric:<32} 实测 {measured[metric]:10.2f}  预算 {limit:10.2f}  上限 {allowed:10.2f}  {status}")
+        if measured[metric] > allowed:
+            failures.append(metric)
+    return failures
+
+
+if __name__ == "__main__":
+    from text_risk_evaluator import TextRiskEvaluator
+
+    parser = argparse.ArgumentParser(description="检查评估流程的峰值/稳态内存是否超出预算，超出时以非零状态退出")
+    parser.add_argument("--sizes", help="逗号分隔的运行规模（如 1000,100000），默认检查预算文件中的全部条目")
+    parser.add_argument("--budgets", default=BUDGETS_PATH)
+    parser.add_argument("--update", action="store_true", help="用本次测量值（向上取整并套用下限）更新预算文件")
+    args = parser.parse_args()
+
+    with open(args.budgets, "r", encoding="utf-8") as f:
+        budgets = json.load(f)
+    evaluator = TextRiskEvaluator()
+    failed = []
+    sizes = args.sizes.split(",") if args.sizes else list(budgets["runs"])
+    for size in sizes:
+        budget = budgets["runs"].get(size, {"traced": int(size) <= 10000})
+        measured = run_size(evaluator, int(size), budget["traced"])
+        print(f"{size} 个物品（{'tracemalloc' if budget['traced'] else 'RSS'}）：")
+        if args.update:
+            print("    实测: " + ", ".join(f"{k}={v:.2f}" for k, v in measured.items() if k not in ("items", "traced")))
+            updated = {"traced": budget["traced"]}
+            for metric, floor in MIN_BUDGETS.items():
+                if metric in measured:
+                    updated[metric] = max(floor, math.ceil(measured[metric] * 1.2 * 10) / 10)
+            budgets["runs"][size] = updated
+            print(f"    预算已更新: {updated}")
+        elif size not in budgets["runs"]:
+            print(f"    预算文件中没有 {size} 的条目，请先使用 --update 生成")
+            failed.append(size)
+        else:
+            failed += [f"{size}:{metric}" for metric in check(measured, budget, budgets["tolerance"])]
+
+    if args.update:
+        with open(args.budgets, "w", encoding="utf-8") as f:
+            json.dump(budgets, f, ensure_ascii=False, indent=2)
+            f.write("\n")
+    if failed:
+        print(f"内存预算检查失败: {', '.join(failed)}")
+        sys.exit(1)
+    print("内存预算检查通过。")
@@ -0,0 +1,183 @@
+import argparse
+import hashlib
+import itertools
+import json
+import sqlite3
+import time
+
+from batch_runner import assess_item, atomic_open, iter_jsonl
+
+HASHED_FIELDS = ("item_text", "item_metadata", "historical_texts", "similar_item_texts")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS entries (
+    item_key TEXT PRIMARY KEY,
+    content_hash TEXT NOT NULL,
+    config_fingerprint TEXT NOT NULL,
+    result_json TEXT NOT NULL,
+    run_id INTEGER NOT NULL,
+    assessed_at REAL NOT NULL
+);
+"""
+
+
+def content_hash(item):
+    payload = {field: item.get(field) for field in HASHED_FIELDS}
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def item_key(item, digest):
+    item_id = item.get("id")
+    return str(item_id) if item_id is not None else "hash:" + digest
+
+
+class ChangeManifest:
+
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        if path != ":memory:":
+            self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def get_meta(self, key, default=None):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def set_meta(self, key, value):
+        self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def begin_run(self):
+        with self.conn:
+            run_id = int(self.get_meta("last_run_id", "0")) + 1
+            self.set_meta("last_run_id", str(run_id))
+        return run_id
+
+    def lookup(self, keys):
+        placeholders = ",".join("?" * len(keys))
+        rows = self.conn.execute(
+            f"SELECT item_key, content_hash, config_fingerprint, result_json FROM entries WHERE item_key IN ({placeholders})",
+            keys)
+        return {row[0]: row[1:] for row in rows}
+
+    def touch(self, keys, run_id):
+        self.conn.executemany("UPDATE entries SET run_id = ? WHERE item_key = ?", [(run_id, key) for key in keys])
+
+    def store(self, entries, config_fingerprint, run_id):
+        now = time.time()
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO entries (item_key, content_hash, config_fingerprint, result_json, run_id, assessed_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [(key, digest, config_fingerprint, result_json, run_id, now) for key, digest, result_json in entries])
+
+    def remove_stale(self, run_id):
+        return self.conn.execute("DELETE FROM entries WHERE run_id != ?", (run_id,)).rowcount
+
+
+def run_incremental(evaluator, items, output_path, manifest, chunk_size=500, pool=None, full=False):
+    config_fingerprint = evaluator.config_fingerprint()
+    previous_fingerprint = manifest.get_meta("config_fingerprint")
+    if previous_fingerprint is not None and previous_fingerprint != config_fingerprint:
+        print(f"评估器配置已变化 ({previous_fingerprint} -> {config_fingerprint})，将重新评估配置指纹不同的物品。")
+    # 配置变化只按每条记录自己的 config_fingerprint 判断：上次运行在配置变化后中断时，已按新配置评估过的物品不会再评估
+    rescore_all = full
+    run_id = manifest.begin_run()
+    stats = {"total": 0, "unchanged": 0, "new": 0, "changed": 0, "config_changed": 0, "deleted": 0}
+
+    iterator = iter(items)
+    with atomic_open(output_path) as output:
+        while True:
+            batch = list(itertools.islice(iterator, chunk_size))
+            if not batch:
+                break
+            digests = [content_hash(item) for item in batch]
+            keys = [item_key(item, digest) for item, digest in zip(batch, digests)]
+            known = manifest.lookup(keys)
+
+            results = {}
+            unchanged_keys = []
+            to_score = []
+            for item, digest, key in zip(batch, digests, keys):
+                entry = known.get(key)
+                if entry is None:
+                    stats["new"] += 1
+                elif entry[0] != digest:
+                    stats["changed"] += 1
+                elif rescore_all or entry[1] != config_fingerprint:
+                    stats["config_changed"] += 1
+                else:
+                    stats["unchanged"] += 1
+                    results[key] = entry[2]
+                    unchanged_keys.append(key)
+                    continue
+                to_score.append((item, digest, key))
+
+            if to_score:
+                scored_items = [item for item, _, _ in to_score]
+                rows = pool.map(scored_items) if pool is not None else [assess_item(evaluator, item) for item in scored_items]
+                entries = []
+                for (_, digest, key), row in zip(to_score, rows):
+                    results[key] = json.dumps(row, ensure_ascii=False)
+                    entries.append((key, digest, results[key]))
+            with manifest.conn:
+                manifest.touch(unchanged_keys, run_id)
+                if to_score:
+                    manifest.store(entries, config_fingerprint, run_id)
+            output.writelines(results[key] + "\n" for key in keys)
+            stats["total"] += len(batch)
+
+    with manifest.conn:
+        stats["deleted"] = manifest.remove_stale(run_id)
+        manifest.set_meta("config_fingerprint", config_fingerprint)
+        manifest.set_meta("last_run_at", str(time.time()))
+    stats["rescored"] = stats["new"] + stats["changed"] + stats["config_changed"]
+    return stats
+
+
+if __name__ == "__main__":
+    from product_store import ProductStore, DEFAULT_DB_PATH
+    from text_risk_evaluator import TextRiskEvaluator
+    from worker_pool import WarmWorkerPool
+
+    parser = argparse.ArgumentParser(description="增量批量评估：只重新评估内容或配置发生变化的物品，并与上次输出合并")
+    parser.add_argument("output", help="合并后的 JSONL 输出文件")
+    parser.add_argument("--manifest", help="变更清单数据库路径（默认为 <output>.manifest.db）")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help="产品数据库路径")
+    parser.add_argument("--input", help="JSONL 输入文件（指定后不读数据库）")
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=0, help="预热工作进程数（0 表示在当前进程内评估）")
+    parser.add_argument("--full", action="store_true", help="忽略清单，重新评估全部物品")
+    args = parser.parse_args()
+
+    evaluator = TextRiskEvaluator()
+    pool = WarmWorkerPool(evaluator, args.workers) if args.workers else None
+    started = time.perf_counter()
+    try:
+        with ChangeManifest(args.manifest or args.output + ".manifest.db") as manifest:
+            if args.input:
+                stats = run_incremental(evaluator, iter_jsonl(args.input), args.output, manifest, args.chunk_size,
+                                        pool, args.full)
+            else:
+                with ProductStore(args.db) as store:
+                    stats = run_incremental(evaluator, store.iter_items(), args.output, manifest, args.chunk_size,
+                                            pool, args.full)
+    finally:
+        if pool is not None:
+            pool.close()
+    print(f"共 {stats['total']} 个物品：未变化 {stats['unchanged']}，新增 {stats['new']}，内容变化 {stats['changed']}，"
+          f"因配置变化重评 {stats['config_changed']}，已删除 {stats['deleted']}；"
+          f"实际评估 {stats['rescored']} 个，耗时 {time.perf_counter() - started:.1f} 秒。")
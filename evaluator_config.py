@@ -0,0 +1,162 @@
+import hashlib
+import json
+import os
+import re
+import threading
+
+from segmenter import DEFAULT_DICT_PATH, dictionary_hash, load_segmenter
+from spec_rules import compile_spec_rules
+from text_analysis import NumericFactExtractor, TextAnalysis
+from tracing import NULL_TRACE
+
+DEFAULT_CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "evaluator_config.json")
+
+THRESHOLD_KEYS = [
+    "sentiment_deviation_threshold",
+    "exaggeration_freq_threshold",
+    "similarity_threshold",
+    "vagueness_ratio_threshold",
+    "suspicious_keywords_threshold",
+    "min_numbers_electronics",
+]
+DEFAULT_LONG_DOCUMENT = {
+    "threshold_chars": 20000,
+    "chunk_chars": 4000,
+    "max_chunks": 16,
+    "originality_sample_chars": 4000,
+}
+DIMENSIONS = [
+    "exaggeration_sentiment",
+    "consistency_factuality",
+    "originality_anomaly",
+    "vagueness_detail",
+]
+
+
+class EvaluatorConfig:
+
+    def __init__(self, settings, rules, version, source_paths=(), segmenter_hash=None):
+        self.settings = settings
+        self.rules = rules
+        self.version = version
+        self.source_paths = tuple(source_paths)
+
+        self.exaggeration_keywords = frozenset(settings["exaggeration_keywords"])
+        self.vague_keywords = frozenset(settings["vague_keywords"])
+        self.suspicious_claim_keywords = frozenset(settings["suspicious_claim_keywords"])
+        keywords = sorted((keyword.lower() for keyword in self.suspicious_claim_keywords), key=len, reverse=True)
+        self.suspicious_pattern = re.compile("(?=(" + "|".join(re.escape(k) for k in keywords) + "))") if keywords else None
+
+        self.dimension_weights = dict(settings["dimension_weights"])
+        missing = [dim for dim in DIMENSIONS if dim not in self.dimension_weights]
+        if missing:
+            raise ValueError(f"配置缺少维度权重: {', '.join(missing)}")
+        for key in THRESHOLD_KEYS:
+            setattr(self, key, settings[key])
+
+        self.long_document = dict(DEFAULT_LONG_DOCUMENT, **settings.get("long_document", {}))
+        if self.long_document["chunk_chars"] <= 0 or self.long_document["max_chunks"] <= 0:
+            raise ValueError("long_document 的 chunk_chars 和 max_chunks 必须为正数")
+
+        self.spec_rules = compile_spec_rules(rules)
+        self.fact_extractor = NumericFactExtractor(self.spec_rules.units)
+        self.segmenter = load_segmenter(
+            settings.get("segmenter_dict", DEFAULT_DICT_PATH),
+            self.exaggeration_keywords | self.vague_keywords | self.suspicious_claim_keywords,
+            segmenter_hash)
+        self.analysis_key = (json.dumps(self.spec_rules.units, sort_keys=True),
+                             json.dumps(self.long_document, sort_keys=True), id(self.segmenter))
+
+    def analyze(self, text, trace=NULL_TRACE):
+        return TextAnalysis(text, self.fact_extractor, self.long_document, self.segmenter, self.analysis_key, trace)
+
+    def count_suspicious_keywords(self, text_lower):
+        if self.suspicious_pattern is None:
+            return 0
+        return len(set(self.suspicious_pattern.findall(text_lower)))
+
+    def with_overrides(self, overrides):
+        settings = dict(self.settings)
+        settings["dimension_weights"] = dict(self.dimension_weights)
+        for name, value in overrides.items():
+            if name.startswith("weight:"):
+                settings["dimension_weights"][name[len("weight:"):]] = value
+            else:
+                settings[name] = value
+        return build_config(settings, self.rules)
+
+
+def build_config(settings, rules, source_paths=()):
+    # 分词词典不在 settings 里，版本号要把词典内容一起算进去，词典改动才会触发切换和重新评估
+    segmenter_hash = dictionary_hash(settings.get("segmenter_dict", DEFAULT_DICT_PATH))
+    encoded = json.dumps({"settings": settings, "rules": rules, "segmenter_dict_hash": segmenter_hash},
+                         sort_keys=True, ensure_ascii=False)
+    version = hashlib.sha256(encoded.encode("utf-8")).hexdigest()[:12]
+    return EvaluatorConfig(settings, rules, version, source_paths, segmenter_hash)
+
+
+def load_config(path=DEFAULT_CONFIG_PATH):
+    with open(path, "r", encoding="utf-8") as f:
+        settings = json.load(f)
+    config_dir = os.path.dirname(os.path.abspath(path))
+    rules_path = os.path.join(config_dir, settings.get("rules_file", "consistency_rules.json"))
+    with open(rules_path, "r", encoding="utf-8") as f:
+        rules = json.load(f)
+    source_paths = [path, rules_path]
+    if "segmenter_dict" in settings:
+        settings["segmenter_dict"] = os.path.join(config_dir, settings["segmenter_dict"])
+    source_paths.append(settings.get("segmenter_dict", DEFAULT_DICT_PATH))
+    return build_config(settings, rules, source_paths)
+
+
+class ConfigWatcher:
+
+    def __init__(self, evaluator, path, interval=1.0):
+        self.evaluator = evaluator
+        self.path = path
+        self.interval = interval
+        self._stop = threading.Event()
+        self._stamps = self._current_stamps(evaluator.config.source_paths or (path,))
+        self._thread = threading.Thread(target=self._run, name="config-watcher", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def _current_stamps(self, paths):
+        stamps = {}
+        for path in paths:
+            try:
+                stat = os.stat(path)
+                stamps[path] = (stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                stamps[path] = None
+        return stamps
+
+    def check_now(self):
+        stamps = self._current_stamps(self._stamps)
+        if stamps == self._stamps:
+            return False
+        self._stamps = stamps
+        try:
+            config = load_config(self.path)
+        except (OSError, ValueError, KeyError, TypeError, re.error) as e:
+            print(f"配置重新加载失败，继续使用版本 {self.evaluator.config.version}: {e}")
+            return False
+        # 沿用加载前的时间戳，加载期间的修改会在下一次检查时被发现；只为新加入的文件取时间戳
+        new_paths = [p for p in config.source_paths if p not in stamps]
+        self._stamps = {p: stamps[p] for p in config.source_paths if p in stamps}
+        self._stamps.update(self._current_stamps(new_paths))
+        if config.version != self.evaluator.config.version:
+            self.evaluator.swap_config(config)
+            print(f"评估器配置已切换到版本 {config.version}")
+        return True
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.check_now()
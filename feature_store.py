@@ -0,0 +1,62 @@
+import numpy as np
+
+FEATURE_COLUMNS = [
+    "empty_text",
+    "sentiment",
+    "baseline_sentiment",
+    "word_count",
+    "exaggeration_count",
+    "metadata_missing",
+    "consistency_penalty",
+    "spec_risk",
+    "suspicious_count",
+    "price",
+    "is_accessories",
+    "avg_similarity",
+    "history_max_len",
+    "history_distance",
+    "length_ratio",
+    "vague_count",
+    "number_count",
+    "is_electronics",
+]
+
+
+def _to_float(value):
+    if value is None:
+        return np.nan
+    return float(value)
+
+
+class FeatureStore:
+
+    def __init__(self):
+        self.item_ids = []
+        self.overall_scores = []
+        self._columns = {name: [] for name in FEATURE_COLUMNS}
+
+    def __len__(self):
+        return len(self.item_ids)
+
+    def append(self, item_id, result):
+        features = result.get("features")
+        if features is None:
+            raise ValueError("评估结果中没有特征，请使用 assess(..., return_features=True)")
+        self.item_ids.append(item_id if item_id is not None else len(self.item_ids))
+        self.overall_scores.append(result["overall_score"])
+        for name, column in self._columns.items():
+            column.append(_to_float(features.get(name)))
+
+    def to_arrays(self):
+        arrays = {name: np.asarray(column, dtype=np.float64) for name, column in self._columns.items()}
+        arrays["item_ids"] = np.asarray(self.item_ids)
+        arrays["overall_score"] = np.asarray(self.overall_scores, dtype=np.float64)
+        return arrays
+
+    def save(self, path):
+        np.savez_compressed(path, **self.to_arrays())
+
+
+def load_features(path):
+    with np.load(path, allow_pickle=False) as data:
+        return {name: data[name] for name in data.files}
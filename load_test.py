@@ -0,0 +1,374 @@
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import platform
+import random
+import threading
+import time
+import urllib.request
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+import numpy as np
+
+from batch_runner import assess_item, atomic_write_text, iter_jsonl
+from worker_pool import read_rss_bytes
+
+PERCENTILES = {"p50_ms": 50, "p95_ms": 95, "p99_ms": 99, "p999_ms": 99.9}
+COMPARE_METRICS = ["throughput", "p50_ms", "p95_ms", "p99_ms", "p999_ms", "mean_ms", "max_ms", "error_rate",
+                   "cpu_percent_mean", "rss_mb_max"]
+
+_EVALUATOR = None
+
+
+def synthetic_items(count, max_repeat=4, seed=42):
+    from product_store import SAMPLE_PRODUCTS
+    rng = random.Random(seed)
+    for item_id in range(1, count + 1):
+        product = rng.choice(SAMPLE_PRODUCTS)
+        sentences = [s for s in product["item_text"].replace("！", "。").split("。") if s]
+        text = "。".join(rng.choice(sentences) for _ in range(len(sentences) * rng.randint(1, max_repeat))) + "。"
+        yield dict(product, id=item_id, item_text=text)
+
+
+def _process_assess(item):
+    return assess_item(_EVALUATOR, item)
+
+
+class InProcessTarget:
+    name = "inprocess"
+
+    def __init__(self, evaluator, concurrency=1):
+        self.evaluator = evaluator
+        self.concurrency = 1
+
+    def submit(self, item):
+        future = Future()
+        try:
+            future.set_result(assess_item(self.evaluator, item))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def child_pids(self):
+        return []
+
+    def close(self):
+        pass
+
+
+class ThreadTarget:
+    name = "threads"
+
+    def __init__(self, evaluator, concurrency):
+        self.evaluator = evaluator
+        self.concurrency = concurrency
+        self.executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="load")
+
+    def submit(self, item):
+        return self.executor.submit(assess_item, self.evaluator, item)
+
+    def child_pids(self):
+        return []
+
+    def close(self):
+        self.executor.shutdown()
+
+
+class ProcessTarget:
+    name = "processes"
+
+    def __init__(self, evaluator, concurrency):
+        global _EVALUATOR
+        _EVALUATOR = evaluator
+        self.concurrency = concurrency
+        self.executor = ProcessPoolExecutor(max_workers=concurrency, mp_context=multiprocessing.get_context("fork"))
+        wait([self.executor.submit(_process_assess, item) for item in synthetic_items(concurrency, 1)])
+
+    def submit(self, item):
+        return self.executor.submit(_process_assess, item)
+
+    def child_pids(self):
+        return [child.pid for child in multiprocessing.active_children()]
+
+    def close(self):
+        self.executor.shutdown()
+
+
+class HttpTarget:
+    name = "http"
+
+    def __init__(self, url, concurrency, timeout=30):
+        self.url = url.rstrip("/") + "/assess"
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="load-http")
+
+    def _post(self, item):
+        request = urllib.request.Request(self.url, data=json.dumps(item, ensure_ascii=False).encode("utf-8"),
+                                         headers={"Content-Type": "application/json"}, method="POST")
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            return json.loads(response.read().decode("utf-8"))
+
+    def submit(self, item):
+        return self.executor.submit(self._post, item)
+
+    def child_pids(self):
+        return []
+
+    def close(self):
+        self.executor.shutdown()
+
+
+class ResourceMonitor:
+
+    def __init__(self, target, interval=1.0):
+        self.target = target
+        self.interval = interval
+        self.samples = []
+        self.completed = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="load-monitor", daemon=True)
+
+    def start(self):
+        self._start_wall = time.perf_counter()
+        self._last = (self._start_wall, self._cpu_seconds(), 0)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+
+    def _cpu_seconds(self):
+        times = os.times()
+        total = times.user + times.system + times.children_user + times.children_system
+        for pid in self.target.child_pids():
+            try:
+                with open(f"/proc/{pid}/stat", "r") as f:
+                    fields = f.read().rsplit(")", 1)[1].split()
+                total += (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+            except (OSError, IndexError, ValueError):
+                pass
+        return total
+
+    def _sample(self):
+        now = time.perf_counter()
+        cpu = self._cpu_seconds()
+        completed = self.completed
+        last_wall, last_cpu, last_completed = self._last
+        elapsed = max(now - last_wall, 1e-9)
+        rss = read_rss_bytes() or 0
+        rss += sum(read_rss_bytes(pid) or 0 for pid in self.target.child_pids())
+        self.samples.append({
+            "t": round(now - self._start_wall, 3),
+            "cpu_percent": round(max(0.0, cpu - last_cpu) / elapsed * 100, 1),
+            "rss_mb": round(rss / 1024 / 1024, 1),
+            "throughput": round((completed - last_completed) / elapsed, 2),
+        })
+        self._last = (now, cpu, completed)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+
+class LoadRun:
+
+    def __init__(self, target, items, mode="closed", requests=1000, duration=None, rate=10.0,
+                 arrival="poisson", monitor_interval=1.0, seed=42):
+        self.target = target
+        self.items = itertools.cycle(items) if isinstance(items, list) else iter(items)
+        self.mode = mode
+        self.requests = requests
+        self.duration = duration
+        self.rate = rate
+        self.arrival = arrival
+        self.random = random.Random(seed)
+        self.monitor = ResourceMonitor(target, monitor_interval)
+        self.latencies = []
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    def _record(self, started, future):
+        latency = time.perf_counter() - started
+        try:
+            row = future.result()
+            failed = any(str(label).startswith("评估出错") for label in row.get("risk_labels", []))
+        except Exception:
+            failed = True
+        with self._lock:
+            self.latencies.append(latency)
+            self.errors += failed
+            self.monitor.completed += 1
+
+    def _next_item(self, sent):
+        if self.requests is not None and sent >= self.requests:
+            return None
+        if self.duration is not None and time.perf_counter() - self.started_at >= self.duration:
+            return None
+        return next(self.items, None)
+
+    def _run_closed(self):
+        in_flight = {}
+        sent = 0
+        while True:
+            while len(in_flight) < self.target.concurrency:
+                item = self._next_item(sent)
+                if item is None:
+                    break
+                started = time.perf_counter()
+                in_flight[self.target.submit(item)] = started
+                sent += 1
+            if not in_flight:
+                return sent
+            done, _ = wait(list(in_flight), return_when=FIRST_COMPLETED)
+            for future in done:
+                self._record(in_flight.pop(future), future)
+
+    def _run_open(self):
+        # 开环：按计划到达时间计算延迟，服务变慢时排队时间也计入，避免协调遗漏
+        pending = []
+        sent = 0
+        scheduled = self.started_at
+        while True:
+            item = self._next_item(sent)
+            if item is None:
+                break
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            future = self.target.submit(item)
+            future.add_done_callback(lambda f, started=scheduled: self._record(started, f))
+            pending.append(future)
+            sent += 1
+            scheduled += self.random.expovariate(self.rate) if self.arrival == "poisson" else 1.0 / self.rate
+        wait(pending)
+        return sent
+
+    def run(self):
+        self.monitor.start()
+        self.started_at = time.perf_counter()
+        sent = self._run_closed() if self.mode == "closed" else self._run_open()
+        elapsed = time.perf_counter() - self.started_at
+        self.monitor.stop()
+        return self.summary(sent, elapsed)
+
+    def summary(self, sent, elapsed):
+        latencies_ms = np.asarray(self.latencies, dtype=np.float64) * 1000
+        completed = len(latencies_ms)
+        metrics = {
+            "sent": sent,
+            "completed": completed,
+            "errors": self.errors,
+            "error_rate": self.errors / completed if completed else 0.0,
+            "elapsed_s": elapsed,
+            "throughput": completed / elapsed if elapsed > 0 else 0.0,
+            "mean_ms": float(latencies_ms.mean()) if completed else None,
+            "max_ms": float(latencies_ms.max()) if completed else None,
+        }
+        for key, percentile in PERCENTILES.items():
+            metrics[key] = float(np.percentile(latencies_ms, percentile)) if completed else None
+        samples = self.monitor.samples
+        metrics["cpu_percent_mean"] = float(np.mean([s["cpu_percent"] for s in samples])) if samples else None
+        metrics["rss_mb_max"] = max(s["rss_mb"] for s in samples) if samples else None
+        return {"metrics": metrics, "timeline": samples}
+
+
+def environment_info(evaluator=None):
+    info = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    if evaluator is not None:
+        info["config_version"] = evaluator.config.version
+    return info
+
+
+def compare_results(base, new):
+    rows = []
+    for metric in COMPARE_METRICS:
+        old_value = base["metrics"].get(metric)
+        new_value = new["metrics"].get(metric)
+        change = None
+        if old_value and new_value is not None:
+            change = (new_value - old_value) / old_value
+        rows.append((metric, old_value, new_value, change))
+    return rows
+
+
+def _load_items(args):
+    if args.input:
+        return list(iter_jsonl(args.input))
+    if args.db:
+        from product_store import ProductStore
+        with ProductStore(args.db) as store:
+            return list(store.iter_items())
+    return list(synthetic_items(args.synthetic, args.max_repeat, args.seed))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="文本风险评估的压测工具（延迟分位数、吞吐量、CPU/内存）")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="执行压测并写出结果文件")
+    run_parser.add_argument("--target", choices=["inprocess", "threads", "processes", "http"], default="inprocess")
+    run_parser.add_argument("--url", default="http://127.0.0.1:8080", help="http 目标的服务地址（见 risk_service.py）")
+    run_parser.add_argument("--mode", choices=["closed", "open"], default="closed",
+                            help="closed: 固定并发循环请求；open: 按到达速率发送请求")
+    run_parser.add_argument("--concurrency", type=int, default=4)
+    run_parser.add_argument("--rate", type=float, default=20.0, help="开环模式下每秒到达的请求数")
+    run_parser.add_argument("--arrival", choices=["poisson", "constant"], default="poisson")
+    run_parser.add_argument("--requests", type=int, help="请求总数")
+    run_parser.add_argument("--duration", type=float, help="压测时长（秒）")
+    run_parser.add_argument("--input", help="回放的 JSONL 物品流")
+    run_parser.add_argument("--db", help="从产品数据库读取物品")
+    run_parser.add_argument("--synthetic", type=int, default=500, help="合成物品数量（未指定 --input/--db 时）")
+    run_parser.add_argument("--max-repeat", type=int, default=4, help="合成文本的最大重复倍数")
+    run_parser.add_argument("--seed", type=int, default=42)
+    run_parser.add_argument("--output", default="load_results.json", help="结果文件路径")
+
+    compare_parser = subparsers.add_parser("compare", help="对比两个结果文件")
+    compare_parser.add_argument("base")
+    compare_parser.add_argument("new")
+    args = parser.parse_args()
+
+    if args.command == "compare":
+        with open(args.base, "r", encoding="utf-8") as f:
+            base = json.load(f)
+        with open(args.new, "r", encoding="utf-8") as f:
+            new = json.load(f)
+        print(f"{'指标':<18}{'基准':>12}{'新版本':>12}{'变化':>10}")
+        for metric, old_value, new_value, change in compare_results(base, new):
+            old_text = f"{old_value:.2f}" if old_value is not None else "-"
+            new_text = f"{new_value:.2f}" if new_value is not None else "-"
+            change_text = f"{change:+.1%}" if change is not None else "-"
+            print(f"{metric:<18}{old_text:>12}{new_text:>12}{change_text:>10}")
+    else:
+        if args.requests is None and args.duration is None:
+            args.requests = 1000
+        items = _load_items(args)
+        evaluator = None
+        if args.target == "http":
+            target = HttpTarget(args.url, args.concurrency)
+        else:
+            from text_risk_evaluator import TextRiskEvaluator
+            evaluator = TextRiskEvaluator()
+            target_class = {"inprocess": InProcessTarget, "threads": ThreadTarget, "processes": ProcessTarget}[args.target]
+            target = target_class(evaluator, args.concurrency)
+        try:
+            result = LoadRun(target, items, args.mode, args.requests, args.duration, args.rate, args.arrival,
+                             seed=args.seed).run()
+        finally:
+            target.close()
+        result["settings"] = {key: value for key, value in vars(args).items() if key != "command"}
+        result["environment"] = environment_info(evaluator)
+        atomic_write_text(args.output, json.dumps(result, ensure_ascii=False, indent=2))
+        metrics = result["metrics"]
+        print(f"完成 {metrics['completed']} 个请求（错误 {metrics['errors']}），吞吐量 {metrics['throughput']:.1f} 次/秒；"
+              f"延迟 p50 {metrics['p50_ms']:.1f} ms  p95 {metrics['p95_ms']:.1f} ms  "
+              f"p99 {metrics['p99_ms']:.1f} ms  p999 {metrics['p999_ms']:.1f} ms。结果已写入 {args.output}")
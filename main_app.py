@@ -3,10 +3,11 @@ from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QListWidget, QListWidgetItem, QLabel, QSplitter, QPushButton,
     QGroupBox, QFormLayout, QFrame, QTextEdit, QMessageBox,
-    QSizePolicy
+    QSizePolicy, QDialog, QDialogButtonBox, QComboBox, QFileDialog,
+    QProgressDialog
 )
 from PyQt6.QtGui import QColor, QIcon, QPainter, QPixmap, QBrush, QPen, QFont
-from PyQt6.QtCore import Qt, QSize
+from PyQt6.QtCore import Qt, QSize, QThread, pyqtSignal
 
 try:
     from text_risk_evaluator import TextRiskEvaluator
@@ -23,63 +24,9 @@ except ImportError:
                 'raw_sentiment': 0.0
             }
 
-PRODUCT_SOURCE_DATA = [
-    {
-        "name": "智能降噪耳机 Pro",
-        "item_text": "采用最新主动降噪技术，有效隔绝环境噪音，提供沉浸式纯净音频体验。人体工学设计，佩戴舒适。单次充电可提供长达20小时的播放时间。支持蓝牙5.2快速连接。",
-        "item_metadata": {"category": "Electronics", "price": 899.00, "specs": {"color": "星空灰", "battery_life_hours": 20, "bluetooth": "5.2"}},
-        "historical_texts": ["新款降噪耳机，提供沉浸式体验，续航20小时。"],
-        "similar_item_texts": [
-            "体验极致降噪，享受音乐本真。XX品牌耳机，续航18小时。",
-            "高性能无线耳机，智能降噪，舒适佩戴。",
-            "专注于音质，主动降噪耳机，电池耐用。"
-        ]
-    },
-    {
-        "name": "“全能王”家用清洁机器人 X1",
-        "item_text": "革命性的家庭清洁解决方案！这款全能王机器人简直是完美！能轻松搞定地毯、地板等所有地面。智能路径规划，覆盖无死角。绝对是现代家庭的必备神器！效果惊人！",
-        "item_metadata": {"category": "Electronics", "price": 2599.00, "specs": {"function": "扫拖一体", "navigation": "LDS激光导航"}},
-        "historical_texts": ["新型扫地机器人，智能规划路径。"],
-        "similar_item_texts": [
-            "智能扫拖机器人，解放双手，高效清洁。",
-            "XX扫地机，激光导航，弓字形清扫。",
-            "家用全自动清洁器，适用于多种地面。"
-        ]
-    },
-    {
-        "name": "神秘量子能量手环",
-        "item_text": "快来佩戴这款独一无二的神秘量子能量手环，即刻感受源自宇宙深处的强大能量！它能显著改善您的健康状况，提升个人运势，带来难以置信的好运！效果保证，无与伦比！全球限量发售，机会难得！",
-        "item_metadata": {"category": "Accessories", "price": 1999.00, "specs": {"material": "未知特殊材质"}},
-        "historical_texts": ["能量手环，改善健康。"],
-        "similar_item_texts": [
-            "健康磁力手链，促进血液循环。",
-            "平衡能量项链，带来身心和谐。",
-            "稀有宝石手串，据说有特殊功效。"
-        ]
-    },
-    {
-        "name": "经典款纯棉T恤 (多色)",
-        "item_text": "基础款男士圆领T恤。选用100%优质长绒棉，面料柔软亲肤，吸湿透气性好，穿着舒适。经典合身版型，不易变形。提供黑色、白色、灰色、藏青色等多种颜色选择。尺码范围：S-XXL。",
-        "item_metadata": {"category": "Apparel", "price": 79.00, "specs": {"material": "100%棉", "neck_style": "圆领", "colors": ["黑", "白", "灰", "藏青"], "sizes": ["S", "M", "L", "XL", "XXL"]}},
-        "historical_texts": ["纯棉T恤，多色可选。"],
-        "similar_item_texts": [
-            "夏季男士纯色T恤，舒适透气。",
-            "基础款棉质上衣，适合日常穿着。",
-            "圆领短袖T恤，简约百搭。"
-        ]
-    },
-     {
-        "name": "超高速SSD固态硬盘 1TB",
-        "item_text": "体验闪电般的启动速度和文件传输！这款固态硬盘读取速度高达惊人的 5000MB/s。采用最新 NVMe 协议，性能卓越。容量1TB，足够存储大量游戏和文件。仅售 $599!",
-        "item_metadata": {"category": "Electronics", "price": 799.00, "specs": {"capacity_gb": 1000, "interface": "NVMe PCIe 4.0", "read_speed_mbps": 3500}},
-        "historical_texts": ["1TB NVMe SSD, 高速读写。"],
-        "similar_item_texts": [
-            "大容量固态硬盘，提升电脑性能。",
-            "NVMe SSD，速度快，稳定性好。",
-            "1TB 存储硬盘，适用于游戏和工作站。"
-        ]
-    }
-]
+from product_store import ProductStore, SAMPLE_PRODUCTS, DEFAULT_DB_PATH
+from risk_levels import map_score_to_level
+from report_export import export_report, export_format, ExportCancelled, RISK_LEVEL_LABELS
 
 def create_risk_icon(level):
     size = 16
@@ -105,14 +52,6 @@ def create_risk_icon(level):
     painter.end()
     return QIcon(pixmap)
 
-def map_score_to_level(score):
-    if score >= 7.5:
-        return "low"
-    elif score >= 4.5:
-        return "medium"
-    else:
-        return "high"
-
 def format_dimension_risk(dim_risk_score):
     risk_scale_10 = round(dim_risk_score * 10)
     if risk_scale_10 <= 3:
@@ -124,6 +63,64 @@ def format_dimension_risk(dim_risk_score):
     return f"{level_text} ({risk_scale_10}/10)"
 
 
+class ExportWorker(QThread):
+    progress = pyqtSignal(int, int)
+    completed = pyqtSignal(int)
+    cancelled = pyqtSignal()
+    failed = pyqtSignal(str)
+
+    def __init__(self, db_path, path, fmt, filters, parent=None):
+        super().__init__(parent)
+        self.db_path = db_path
+        self.path = path
+        self.fmt = fmt
+        self.filters = filters
+
+    def run(self):
+        # SQLite 连接不能跨线程使用，工作线程自己打开一个只读用的连接
+        try:
+            with ProductStore(self.db_path) as store:
+                count = export_report(store, self.path, self.fmt, self.filters,
+                                      progress=self.progress.emit,
+                                      should_cancel=self.isInterruptionRequested)
+        except ExportCancelled:
+            self.cancelled.emit()
+        except Exception as e:
+            self.failed.emit(str(e))
+        else:
+            self.completed.emit(count)
+
+
+class ExportDialog(QDialog):
+    def __init__(self, categories, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("导出评估报告")
+        layout = QFormLayout(self)
+
+        self.risk_level_combo = QComboBox()
+        self.risk_level_combo.addItem("全部", None)
+        for level, label in RISK_LEVEL_LABELS.items():
+            self.risk_level_combo.addItem(label, level)
+        layout.addRow("风险等级:", self.risk_level_combo)
+
+        self.category_combo = QComboBox()
+        self.category_combo.addItem("全部", None)
+        for category in categories:
+            self.category_combo.addItem(category, category)
+        layout.addRow("类别:", self.category_combo)
+
+        buttons = QDialogButtonBox(QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel)
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        layout.addRow(buttons)
+
+    def filters(self):
+        return {
+            "risk_level": self.risk_level_combo.currentData(),
+            "category": self.category_combo.currentData(),
+        }
+
+
 class RiskAssessmentApp(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -137,7 +134,10 @@ class RiskAssessmentApp(QMainWindow):
             "Accessories": {"avg_sentiment": 0.2, "avg_length": 50}
         }
         self.evaluator = TextRiskEvaluator(category_baselines=category_baselines)
+        self.store = ProductStore(DEFAULT_DB_PATH)
+        self.store.seed(SAMPLE_PRODUCTS)
         self.processed_data = []
+        self.export_worker = None
         self.load_and_assess_data()
 
         self.central_widget = QWidget()
@@ -150,7 +150,15 @@ class RiskAssessmentApp(QMainWindow):
         self.list_widget = QListWidget()
         self.list_widget.setStyleSheet("QListWidget::item { padding: 5px; }")
         self.list_widget.currentItemChanged.connect(self.display_item_details)
-        self.splitter.addWidget(self.list_widget)
+
+        list_panel = QWidget()
+        list_layout = QVBoxLayout(list_panel)
+        list_layout.setContentsMargins(0, 0, 0, 0)
+        list_layout.addWidget(self.list_widget)
+        self.export_button = QPushButton("导出评估报告...")
+        self.export_button.clicked.connect(self.export_reports)
+        list_layout.addWidget(self.export_button)
+        self.splitter.addWidget(list_panel)
 
         self.detail_widget = QWidget()
         self.detail_layout = QVBoxLayout(self.detail_widget)
@@ -261,7 +269,7 @@ class RiskAssessmentApp(QMainWindow):
     def load_and_assess_data(self):
         print("正在加载和评估产品数据...")
         self.processed_data = []
-        for index, source_item in enumerate(PRODUCT_SOURCE_DATA):
+        for source_item in self.store.iter_items():
             print(f"  评估物品: {source_item['name']}")
             try:
                 assessment_result = self.evaluator.assess(
@@ -270,25 +278,26 @@ class RiskAssessmentApp(QMainWindow):
                     historical_texts=source_item.get("historical_texts"),
                     similar_item_texts=source_item.get("similar_item_texts")
                 )
-
-                processed_item = source_item.copy()
-                processed_item['assessment'] = assessment_result
-                processed_item['risk_level'] = map_score_to_level(assessment_result['overall_score'])
+                risk_level = map_score_to_level(assessment_result['overall_score'])
 
                 if assessment_result['risk_labels']:
-                     processed_item['tooltip'] = f"评分 {assessment_result['overall_score']}/10 | 主要风险: {assessment_result['risk_labels'][0]}"
+                     tooltip = f"评分 {assessment_result['overall_score']}/10 | 主要风险: {assessment_result['risk_labels'][0]}"
                 else:
-                    processed_item['tooltip'] = f"评分 {assessment_result['overall_score']}/10 | 无明显风险标签"
-
-                self.processed_data.append(processed_item)
+                    tooltip = f"评分 {assessment_result['overall_score']}/10 | 无明显风险标签"
 
             except Exception as e:
                 print(f"错误：评估物品 '{source_item['name']}' 时出错: {e}")
-                processed_item = source_item.copy()
-                processed_item['assessment'] = {'overall_score': 0, 'dimension_risks': {}, 'risk_labels': [f'评估出错: {e}'], 'raw_sentiment': None}
-                processed_item['risk_level'] = 'high'
-                processed_item['tooltip'] = '评估过程中发生错误'
-                self.processed_data.append(processed_item)
+                assessment_result = {'overall_score': 0, 'dimension_risks': {}, 'risk_labels': [f'评估出错: {e}'], 'raw_sentiment': None}
+                risk_level = 'high'
+                tooltip = '评估过程中发生错误'
+
+            self.store.save_assessment(source_item['id'], assessment_result, risk_level)
+            self.processed_data.append({
+                'id': source_item['id'],
+                'name': source_item['name'],
+                'risk_level': risk_level,
+                'tooltip': tooltip,
+            })
 
         print("数据评估完成。")
 
@@ -326,7 +335,10 @@ class RiskAssessmentApp(QMainWindow):
              print(f"错误：无效的物品索引 {item_index}")
              return
 
-        item_data = self.processed_data[item_index]
+        item_data = self.store.get_item(self.processed_data[item_index]['id'], with_texts=False)
+        if item_data is None:
+             print(f"错误：数据库中找不到物品 {self.processed_data[item_index]['name']}")
+             return
         assessment = item_data.get('assessment')
 
         self.item_name_label.setText(item_data["name"])
@@ -414,6 +426,7 @@ class RiskAssessmentApp(QMainWindow):
         if current_item and current_item.data(Qt.ItemDataRole.UserRole) is not None:
             item_index = current_item.data(Qt.ItemDataRole.UserRole)
             item_name = self.processed_data[item_index]['name']
+            self.store.record_feedback(self.processed_data[item_index]['id'], "accurate", self.processed_data[item_index]['risk_level'])
             QMessageBox.information(self, "反馈已记录", f"感谢反馈！已记录您认为对 '{item_name}' 的评估是准确的 👍。")
             print(f"用户反馈: 对 '{item_name}' 的评估准确 👍")
         else:
@@ -424,6 +437,7 @@ class RiskAssessmentApp(QMainWindow):
         if current_item and current_item.data(Qt.ItemDataRole.UserRole) is not None:
             item_index = current_item.data(Qt.ItemDataRole.UserRole)
             item_name = self.processed_data[item_index]['name']
+            self.store.record_feedback(self.processed_data[item_index]['id'], "inaccurate", self.processed_data[item_index]['risk_level'])
             QMessageBox.information(self, "反馈已记录", f"感谢反馈！已记录您认为对 '{item_name}' 的评估不准确 👎。我们会参考此信息改进模型。")
             print(f"用户反馈: 对 '{item_name}' 的评估不准确 👎")
         else:
@@ -434,11 +448,65 @@ class RiskAssessmentApp(QMainWindow):
         if current_item and current_item.data(Qt.ItemDataRole.UserRole) is not None:
             item_index = current_item.data(Qt.ItemDataRole.UserRole)
             item_name = self.processed_data[item_index]['name']
+            self.store.record_feedback(self.processed_data[item_index]['id'], "suspicious", self.processed_data[item_index]['risk_level'])
             QMessageBox.information(self, "报告已提交", f"感谢您的警惕！我们已收到您对 '{item_name}' 文本可疑性的报告，将进行进一步核查。")
             print(f"用户报告: 认为 '{item_name}' 的文本可疑")
         else:
              QMessageBox.warning(self, "操作无效", "请先在左侧列表中选择一个物品。")
 
+    def export_reports(self):
+        dialog = ExportDialog(self.store.list_categories(), self)
+        if dialog.exec() != QDialog.DialogCode.Accepted:
+            return
+        path, _ = QFileDialog.getSaveFileName(
+            self, "导出评估报告", "评估报告.csv",
+            "CSV 文件 (*.csv);;HTML 文件 (*.html);;Excel 文件 (*.xlsx)")
+        if not path:
+            return
+        try:
+            fmt = export_format(path)
+        except ValueError as e:
+            QMessageBox.warning(self, "导出失败", str(e))
+            return
+
+        self.export_progress = QProgressDialog("正在导出评估报告...", "取消", 0, 0, self)
+        self.export_progress.setWindowTitle("导出评估报告")
+        self.export_progress.setWindowModality(Qt.WindowModality.WindowModal)
+        self.export_progress.setMinimumDuration(0)
+        self.export_progress.setAutoClose(False)
+        self.export_progress.setAutoReset(False)
+
+        self.export_worker = ExportWorker(self.store.db_path, path, fmt, dialog.filters(), self)
+        self.export_worker.progress.connect(self._export_progress)
+        self.export_worker.completed.connect(
+            lambda count: QMessageBox.information(self, "导出完成", f"已导出 {count} 个物品到 {path}"))
+        self.export_worker.cancelled.connect(
+            lambda: QMessageBox.information(self, "导出已取消", "导出已取消，未写入任何文件。"))
+        self.export_worker.failed.connect(lambda message: QMessageBox.warning(self, "导出失败", message))
+        self.export_worker.finished.connect(self._export_finished)
+        self.export_progress.canceled.connect(self.export_worker.requestInterruption)
+        self.export_button.setEnabled(False)
+        self.export_worker.start()
+
+    def _export_progress(self, done, total):
+        self.export_progress.setMaximum(max(total, 1))
+        self.export_progress.setValue(done)
+        self.export_progress.setLabelText(f"正在导出评估报告... {done}/{total}")
+
+    def _export_finished(self):
+        self.export_progress.close()
+        self.export_button.setEnabled(True)
+        self.export_worker.deleteLater()
+        self.export_worker = None
+
+    def closeEvent(self, event):
+        if self.export_worker is not None:
+            for signal in (self.export_worker.completed, self.export_worker.cancelled, self.export_worker.failed):
+                signal.disconnect()
+            self.export_worker.requestInterruption()
+            self.export_worker.wait()
+        super().closeEvent(event)
+
 if __name__ == "__main__":
     try:
         if hasattr(Qt.ApplicationAttribute, 'AA_EnableHighDpiScaling'):
@@ -0,0 +1,196 @@
+import argparse
+import functools
+import gc
+import itertools
+import json
+import tracemalloc
+
+import numpy as np
+
+from batch_runner import assess_item
+from worker_pool import read_rss_bytes
+
+DIMENSION_METHODS = {
+    "exaggeration_sentiment": "_assess_sentiment_exaggeration",
+    "consistency_factuality": "_assess_consistency",
+    "originality_anomaly": "_assess_originality_anomaly",
+    "vagueness_detail": "_assess_vagueness",
+}
+MB = 1024 * 1024
+
+
+class DimensionMemoryStats:
+
+    def __init__(self):
+        self.calls = 0
+        self.peak_bytes = 0
+        self.peak_sum = 0
+        self.retained_bytes = 0
+
+    def add(self, peak, retained):
+        self.calls += 1
+        self.peak_bytes = max(self.peak_bytes, peak)
+        self.peak_sum += peak
+        self.retained_bytes += retained
+
+    def to_dict(self):
+        return {
+            "calls": self.calls,
+            "max_peak_kb": self.peak_bytes / 1024,
+            "mean_peak_kb": self.peak_sum / self.calls / 1024 if self.calls else 0.0,
+            "retained_kb": self.retained_bytes / 1024,
+        }
+
+
+class MemoryProfiler:
+
+    def __init__(self, evaluator, frames=1):
+        self.evaluator = evaluator
+        self.frames = frames
+        self.stats = {name: DimensionMemoryStats() for name in list(DIMENSION_METHODS) + ["assess"]}
+        self._originals = {}
+        self._peaks = []
+
+    def _measure(self, name, method):
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            before, peak = tracemalloc.get_traced_memory()
+            # 嵌套调用会重置峰值计数，先把当前峰值记到外层调用上
+            if self._peaks:
+                self._peaks[-1] = max(self._peaks[-1], peak)
+            tracemalloc.reset_peak()
+            self._peaks.append(before)
+            try:
+                return method(*args, **kwargs)
+            finally:
+                current, peak = tracemalloc.get_traced_memory()
+                peak = max(peak, self._peaks.pop())
+                self.stats[name].add(peak - before, current - before)
+                if self._peaks:
+                    self._peaks[-1] = max(self._peaks[-1], peak)
+        return wrapper
+
+    def __enter__(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self._started = True
+        else:
+            self._started = False
+        for name, method_name in DIMENSION_METHODS.items():
+            self._originals[method_name] = getattr(self.evaluator, method_name)
+            setattr(self.evaluator, method_name, self._measure(name, self._originals[method_name]))
+        self._originals["assess"] = self.evaluator.assess
+        self.evaluator.assess = self._measure("assess", self._originals["assess"])
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        for method_name in self._originals:
+            delattr(self.evaluator, method_name)
+        self._originals = {}
+        if self._started:
+            tracemalloc.stop()
+        return False
+
+    def report(self):
+        return {name: stats.to_dict() for name, stats in self.stats.items()}
+
+
+def run_items(evaluator, items, keep_results=False):
+    results = [] if keep_results else None
+    for item in items:
+        row = assess_item(evaluator, item)
+        if keep_results:
+            results.append(row)
+    return results
+
+
+def measure_run(evaluator, items, warmup=50, sample_every=100, traced=True):
+    items = iter(items)
+    run_items(evaluator, itertools.islice(items, warmup))
+    gc.collect()
+    if traced:
+        tracemalloc.start()
+    try:
+        baseline_traced = tracemalloc.get_traced_memory()[0] if traced else 0
+        baseline_rss = read_rss_bytes() or 0
+        timeline = []
+        processed = 0
+        while True:
+            batch = list(itertools.islice(items, sample_every))
+            if not batch:
+                break
+            run_items(evaluator, batch)
+            processed += len(batch)
+            gc.collect()
+            traced_bytes = tracemalloc.get_traced_memory()[0] - baseline_traced if traced else 0
+            timeline.append((processed, traced_bytes, (read_rss_bytes() or 0) - baseline_rss))
+        peak = tracemalloc.get_traced_memory()[1] - baseline_traced if traced else 0
+    finally:
+        if traced:
+            tracemalloc.stop()
+
+    steady = timeline[len(timeline) // 2:]
+    growth = {"traced": 0.0, "rss": 0.0}
+    if len(steady) >= 2:
+        counts = np.asarray([row[0] for row in steady], dtype=np.float64)
+        growth["traced"] = float(np.polyfit(counts, [row[1] for row in steady], 1)[0]) * 1000
+        growth["rss"] = float(np.polyfit(counts, [row[2] for row in steady], 1)[0]) * 1000
+    result = {
+        "items": processed,
+        "traced": traced,
+        "rss_growth_mb": timeline[-1][2] / MB if timeline else 0.0,
+        "rss_peak_growth_mb": max(row[2] for row in timeline) / MB if timeline else 0.0,
+        "steady_rss_growth_kb_per_1k": growth["rss"] / 1024,
+    }
+    if traced:
+        result["peak_traced_mb"] = peak / MB
+        result["retained_traced_mb"] = timeline[-1][1] / MB if timeline else 0.0
+        result["steady_traced_growth_kb_per_1k"] = growth["traced"] / 1024
+    return result
+
+
+def top_allocations(evaluator, items, limit=15):
+    tracemalloc.start(10)
+    try:
+        gc.collect()
+        before = tracemalloc.take_snapshot()
+        run_items(evaluator, items)
+        gc.collect()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    filters = [tracemalloc.Filter(False, tracemalloc.__file__)]
+    return after.filter_traces(filters).compare_to(before.filter_traces(filters), "lineno")[:limit]
+
+
+if __name__ == "__main__":
+    from load_test import synthetic_items
+    from text_risk_evaluator import TextRiskEvaluator
+
+    parser = argparse.ArgumentParser(description="评估流程的 tracemalloc 内存分析（按维度统计分配）")
+    parser.add_argument("--items", type=int, default=1000, help="合成物品数量")
+    parser.add_argument("--top", type=int, default=10, help="显示分配增量最多的代码行数")
+    parser.add_argument("--output", help="把报告写入 JSON 文件")
+    args = parser.parse_args()
+
+    evaluator = TextRiskEvaluator()
+    items = list(synthetic_items(args.items))
+    with MemoryProfiler(evaluator) as profiler:
+        run_items(evaluator, items)
+    dimensions = profiler.report()
+    print("各维度内存分配（tracemalloc）：")
+    for name, stats in dimensions.items():
+        print(f"  {name:<24} 调用 {stats['calls']:>6}  平均峰值 {stats['mean_peak_kb']:9.1f} KB  "
+              f"最大峰值 {stats['max_peak_kb']:9.1f} KB  返回时仍占用 {stats['retained_kb']:9.1f} KB")
+
+    run = measure_run(evaluator, synthetic_items(args.items + 50, seed=7), sample_every=max(1, args.items // 20))
+    print(f"稳态运行 {run['items']} 个物品：峰值 {run['peak_traced_mb']:.2f} MB，残留 {run['retained_traced_mb']:.2f} MB，"
+          f"每千个物品增长 {run['steady_traced_growth_kb_per_1k']:.1f} KB，RSS 增长 {run['rss_growth_mb']:.1f} MB")
+
+    print(f"分配增量最多的 {args.top} 行：")
+    for stat in top_allocations(evaluator, items[:200], args.top):
+        print(f"  {stat}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"dimensions": dimensions, "run": run}, f, ensure_ascii=False, indent=2)
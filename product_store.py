@@ -0,0 +1,318 @@
+import json
+import os
+import sqlite3
+import time
+
+DEFAULT_DB_PATH = "products.db"
+DEFAULT_PAGE_SIZE = 200
+
+SAMPLE_PRODUCTS = [
+    {
+        "name": "智能降噪耳机 Pro",
+        "item_text": "采用最新主动降噪技术，有效隔绝环境噪音，提供沉浸式纯净音频体验。人体工学设计，佩戴舒适。单次充电可提供长达20小时的播放时间。支持蓝牙5.2快速连接。",
+        "item_metadata": {"category": "Electronics", "price": 899.00, "specs": {"color": "星空灰", "battery_life_hours": 20, "bluetooth": "5.2"}},
+        "historical_texts": ["新款降噪耳机，提供沉浸式体验，续航20小时。"],
+        "similar_item_texts": [
+            "体验极致降噪，享受音乐本真。XX品牌耳机，续航18小时。",
+            "高性能无线耳机，智能降噪，舒适佩戴。",
+            "专注于音质，主动降噪耳机，电池耐用。"
+        ]
+    },
+    {
+        "name": "“全能王”家用清洁机器人 X1",
+        "item_text": "革命性的家庭清洁解决方案！这款全能王机器人简直是完美！能轻松搞定地毯、地板等所有地面。智能路径规划，覆盖无死角。绝对是现代家庭的必备神器！效果惊人！",
+        "item_metadata": {"category": "Electronics", "price": 2599.00, "specs": {"function": "扫拖一体", "navigation": "LDS激光导航"}},
+        "historical_texts": ["新型扫地机器人，智能规划路径。"],
+        "similar_item_texts": [
+            "智能扫拖机器人，解放双手，高效清洁。",
+            "XX扫地机，激光导航，弓字形清扫。",
+            "家用全自动清洁器，适用于多种地面。"
+        ]
+    },
+    {
+        "name": "神秘量子能量手环",
+        "item_text": "快来佩戴这款独一无二的神秘量子能量手环，即刻感受源自宇宙深处的强大能量！它能显著改善您的健康状况，提升个人运势，带来难以置信的好运！效果保证，无与伦比！全球限量发售，机会难得！",
+        "item_metadata": {"category": "Accessories", "price": 1999.00, "specs": {"material": "未知特殊材质"}},
+        "historical_texts": ["能量手环，改善健康。"],
+        "similar_item_texts": [
+            "健康磁力手链，促进血液循环。",
+            "平衡能量项链，带来身心和谐。",
+            "稀有宝石手串，据说有特殊功效。"
+        ]
+    },
+    {
+        "name": "经典款纯棉T恤 (多色)",
+        "item_text": "基础款男士圆领T恤。选用100%优质长绒棉，面料柔软亲肤，吸湿透气性好，穿着舒适。经典合身版型，不易变形。提供黑色、白色、灰色、藏青色等多种颜色选择。尺码范围：S-XXL。",
+        "item_metadata": {"category": "Apparel", "price": 79.00, "specs": {"material": "100%棉", "neck_style": "圆领", "colors": ["黑", "白", "灰", "藏青"], "sizes": ["S", "M", "L", "XL", "XXL"]}},
+        "historical_texts": ["纯棉T恤，多色可选。"],
+        "similar_item_texts": [
+            "夏季男士纯色T恤，舒适透气。",
+            "基础款棉质上衣，适合日常穿着。",
+            "圆领短袖T恤，简约百搭。"
+        ]
+    },
+     {
+        "name": "超高速SSD固态硬盘 1TB",
+        "item_text": "体验闪电般的启动速度和文件传输！这款固态硬盘读取速度高达惊人的 5000MB/s。采用最新 NVMe 协议，性能卓越。容量1TB，足够存储大量游戏和文件。仅售 $599!",
+        "item_metadata": {"category": "Electronics", "price": 799.00, "specs": {"capacity_gb": 1000, "interface": "NVMe PCIe 4.0", "read_speed_mbps": 3500}},
+        "historical_texts": ["1TB NVMe SSD, 高速读写。"],
+        "similar_item_texts": [
+            "大容量固态硬盘，提升电脑性能。",
+            "NVMe SSD，速度快，稳定性好。",
+            "1TB 存储硬盘，适用于游戏和工作站。"
+        ]
+    }
+]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    category TEXT,
+    price REAL,
+    item_text TEXT NOT NULL DEFAULT '',
+    metadata_json TEXT,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS item_texts (
+    item_id INTEGER NOT NULL REFERENCES items(id) ON DELETE CASCADE,
+    kind TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    text TEXT NOT NULL,
+    PRIMARY KEY (item_id, kind, position)
+);
+CREATE TABLE IF NOT EXISTS assessments (
+    item_id INTEGER PRIMARY KEY REFERENCES items(id) ON DELETE CASCADE,
+    overall_score REAL NOT NULL,
+    risk_level TEXT NOT NULL,
+    dimension_risks_json TEXT,
+    risk_labels_json TEXT,
+    raw_sentiment REAL,
+    assessed_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS feedback (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    item_id INTEGER NOT NULL REFERENCES items(id) ON DELETE CASCADE,
+    verdict TEXT NOT NULL,
+    risk_level TEXT,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_feedback_item ON feedback(item_id, id);
+CREATE INDEX IF NOT EXISTS idx_items_category ON items(category, id);
+CREATE INDEX IF NOT EXISTS idx_items_updated ON items(updated_at, id);
+CREATE INDEX IF NOT EXISTS idx_assessments_score ON assessments(overall_score, item_id);
+CREATE INDEX IF NOT EXISTS idx_assessments_level ON assessments(risk_level, item_id);
+"""
+
+TEXT_KINDS = {"historical": "historical_texts", "similar": "similar_item_texts"}
+
+
+class ProductStore:
+
+    def __init__(self, db_path=DEFAULT_DB_PATH):
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        if db_path != ":memory:":
+            self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def count_items(self):
+        return self.conn.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+
+    def seed(self, products):
+        if self.count_items() == 0:
+            self.add_items(products)
+
+    def add_items(self, products):
+        ids = []
+        with self.conn:
+            for product in products:
+                ids.append(self._write_item(product, product.get("id")))
+        return ids
+
+    def upsert_item(self, product, item_id=None):
+        with self.conn:
+            return self._write_item(product, item_id)
+
+    def _write_item(self, product, item_id):
+        metadata = product.get("item_metadata") or {}
+        row = (
+            product["name"],
+            metadata.get("category"),
+            metadata.get("price"),
+            product.get("item_text", ""),
+            json.dumps(metadata, ensure_ascii=False) if metadata else None,
+            product.get("updated_at", time.time()),
+        )
+        if item_id is None:
+            cursor = self.conn.execute(
+                "INSERT INTO items (name, category, price, item_text, metadata_json, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)", row)
+            item_id = cursor.lastrowid
+        else:
+            self.conn.execute(
+                "INSERT INTO items (id, name, category, price, item_text, metadata_json, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(id) DO UPDATE SET name = excluded.name, category = excluded.category, "
+                "price = excluded.price, item_text = excluded.item_text, "
+                "metadata_json = excluded.metadata_json, updated_at = excluded.updated_at",
+                (item_id,) + row)
+            self.conn.execute("DELETE FROM item_texts WHERE item_id = ?", (item_id,))
+
+        for kind, field in TEXT_KINDS.items():
+            self.conn.executemany(
+                "INSERT INTO item_texts (item_id, kind, position, text) VALUES (?, ?, ?, ?)",
+                [(item_id, kind, position, text) for position, text in enumerate(product.get(field) or [])])
+        return item_id
+
+    def delete_item(self, item_id):
+        with self.conn:
+            self.conn.execute("DELETE FROM items WHERE id = ?", (item_id,))
+
+    def export_corpus(self, path, kind="item_text", page_size=DEFAULT_PAGE_SIZE):
+        from shared_corpus import write_corpus
+
+        if kind == "item_text":
+            entries = ((item["id"], [item["item_text"]])
+                       for item in self.iter_items(page_size=page_size, with_texts=False))
+        else:
+            entries = ((item["id"], item[TEXT_KINDS[kind]])
+                       for item in self.iter_items(page_size=page_size))
+        return write_corpus(path, entries)
+
+    def save_assessment(self, item_id, assessment, risk_level):
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO assessments (item_id, overall_score, risk_level, dimension_risks_json, "
+                "risk_labels_json, raw_sentiment, assessed_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (item_id, assessment.get("overall_score", 0), risk_level,
+                 json.dumps(assessment.get("dimension_risks", {}), ensure_ascii=False),
+                 json.dumps(assessment.get("risk_labels", []), ensure_ascii=False),
+                 assessment.get("raw_sentiment"), time.time()))
+
+    def input_fingerprint(self):
+        count, max_id, last_update = self.conn.execute(
+            "SELECT COUNT(*), MAX(id), MAX(updated_at) FROM items").fetchone()
+        return f"{os.path.abspath(self.db_path)}:{count}:{max_id}:{last_update}"
+
+    def record_feedback(self, item_id, verdict, risk_level):
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO feedback (item_id, verdict, risk_level, created_at) VALUES (?, ?, ?, ?)",
+                (item_id, verdict, risk_level, time.time()))
+
+    def iter_feedback(self):
+        rows = self.conn.execute(
+            "SELECT item_id, verdict, risk_level, created_at FROM feedback "
+            "WHERE id IN (SELECT MAX(id) FROM feedback GROUP BY item_id) ORDER BY item_id")
+        for row in rows:
+            yield dict(row)
+
+    def get_item(self, item_id, with_texts=True):
+        rows = self._select_items("i.id = ?", [item_id], limit=1, with_texts=with_texts)
+        return rows[0] if rows else None
+
+    def get_assessment(self, item_id):
+        row = self.conn.execute("SELECT * FROM assessments WHERE item_id = ?", (item_id,)).fetchone()
+        return self._assessment_from_row(row) if row else None
+
+    def query_page(self, category=None, min_score=None, max_score=None, risk_level=None,
+                   updated_after=None, assessed_only=False, cursor=0, page_size=DEFAULT_PAGE_SIZE, with_texts=True):
+        conditions, params = self._filter_conditions(category, min_score, max_score, risk_level, updated_after,
+                                                     assessed_only)
+        conditions.insert(0, "i.id > ?")
+        params.insert(0, cursor or 0)
+        items = self._select_items(" AND ".join(conditions), params, limit=page_size, with_texts=with_texts)
+        next_cursor = items[-1]["id"] if len(items) == page_size else None
+        return items, next_cursor
+
+    def count_matching(self, category=None, min_score=None, max_score=None, risk_level=None,
+                       updated_after=None, assessed_only=False):
+        conditions, params = self._filter_conditions(category, min_score, max_score, risk_level, updated_after,
+                                                     assessed_only)
+        return self.conn.execute(
+            "SELECT COUNT(*) FROM items i LEFT JOIN assessments a ON a.item_id = i.id "
+            f"WHERE {' AND '.join(conditions) or '1'}", params).fetchone()[0]
+
+    def list_categories(self):
+        rows = self.conn.execute("SELECT DISTINCT category FROM items WHERE category IS NOT NULL ORDER BY category")
+        return [row[0] for row in rows]
+
+    def _filter_conditions(self, category, min_score, max_score, risk_level, updated_after, assessed_only):
+        conditions = []
+        params = []
+        if category is not None:
+            conditions.append("i.category = ?")
+            params.append(category)
+        if updated_after is not None:
+            conditions.append("i.updated_at > ?")
+            params.append(updated_after)
+        if assessed_only:
+            conditions.append("a.item_id IS NOT NULL")
+        if min_score is not None:
+            conditions.append("a.overall_score >= ?")
+            params.append(min_score)
+        if max_score is not None:
+            conditions.append("a.overall_score < ?")
+            params.append(max_score)
+        if risk_level is not None:
+            conditions.append("a.risk_level = ?")
+            params.append(risk_level)
+        return conditions, params
+
+    def iter_items(self, page_size=DEFAULT_PAGE_SIZE, cursor=0, **filters):
+        while cursor is not None:
+            items, cursor = self.query_page(cursor=cursor, page_size=page_size, **filters)
+            for item in items:
+                yield item
+
+    def _select_items(self, where, params, limit, with_texts):
+        rows = self.conn.execute(
+            "SELECT i.*, a.overall_score, a.risk_level, a.dimension_risks_json, a.risk_labels_json, "
+            "a.raw_sentiment, a.assessed_at FROM items i LEFT JOIN assessments a ON a.item_id = i.id "
+            f"WHERE {where} ORDER BY i.id LIMIT ?", list(params) + [limit]).fetchall()
+        items = [self._item_from_row(row) for row in rows]
+        if with_texts and items:
+            by_id = {item["id"]: item for item in items}
+            placeholders = ",".join("?" * len(by_id))
+            text_rows = self.conn.execute(
+                f"SELECT item_id, kind, text FROM item_texts WHERE item_id IN ({placeholders}) "
+                "ORDER BY item_id, kind, position", list(by_id)).fetchall()
+            for text_row in text_rows:
+                by_id[text_row["item_id"]][TEXT_KINDS[text_row["kind"]]].append(text_row["text"])
+        return items
+
+    def _item_from_row(self, row):
+        item = {
+            "id": row["id"],
+            "name": row["name"],
+            "item_text": row["item_text"],
+            "item_metadata": json.loads(row["metadata_json"]) if row["metadata_json"] else None,
+            "historical_texts": [],
+            "similar_item_texts": [],
+            "updated_at": row["updated_at"],
+        }
+        if row["overall_score"] is not None:
+            item["assessment"] = self._assessment_from_row(row)
+            item["risk_level"] = row["risk_level"]
+        return item
+
+    def _assessment_from_row(self, row):
+        return {
+            "overall_score": row["overall_score"],
+            "dimension_risks": json.loads(row["dimension_risks_json"] or "{}"),
+            "risk_labels": json.loads(row["risk_labels_json"] or "[]"),
+            "raw_sentiment": row["raw_sentiment"],
+            "assessed_at": row["assessed_at"],
+        }
@@ -0,0 +1,291 @@
+import argparse
+import heapq
+import itertools
+import math
+import threading
+import time
+
+from batch_runner import assess_item
+from product_store import ProductStore, DEFAULT_DB_PATH
+from risk_levels import distance_to_band_edge, map_score_to_level
+
+DEFAULT_WEIGHTS = {
+    "age": 1.0,
+    "traffic": 0.5,
+    "band_edge": 1.5,
+    "change": 2.0,
+}
+NEVER_ASSESSED_SCORE = 1e9
+
+
+class ItemState:
+    __slots__ = ("item_id", "assessed_at", "score", "traffic", "traffic_at", "change", "version")
+
+    def __init__(self, item_id, assessed_at=None, score=None):
+        self.item_id = item_id
+        self.assessed_at = assessed_at
+        self.score = score
+        self.traffic = 0.0
+        self.traffic_at = time.time()
+        self.change = 0.0
+        self.version = 0
+
+
+class ReassessmentScheduler:
+
+    def __init__(self, evaluator, db_path=DEFAULT_DB_PATH, cpu_budget=0.25, burst_seconds=2.0,
+                 rebuild_interval=300.0, weights=None, age_scale_hours=24.0, traffic_half_life_hours=6.0,
+                 edge_scale=0.5, min_age_seconds=60.0):
+        if not cpu_budget > 0:
+            raise ValueError(f"cpu_budget 必须大于 0，当前为 {cpu_budget}")
+        self.evaluator = evaluator
+        self.db_path = db_path
+        self.cpu_budget = cpu_budget
+        self.burst_seconds = burst_seconds
+        self.rebuild_interval = rebuild_interval
+        self.weights = dict(DEFAULT_WEIGHTS, **(weights or {}))
+        self.age_scale = age_scale_hours * 3600
+        self.traffic_decay = math.log(2) / (traffic_half_life_hours * 3600)
+        self.edge_scale = edge_scale
+        self.min_age_seconds = min_age_seconds
+
+        self.states = {}
+        self.stats = {"assessed": 0, "band_flips": 0, "cpu_seconds": 0.0, "rebuilds": 0, "change_events": 0}
+        self._heap = []
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._last_rebuild = 0.0
+        self._touched = None
+
+    def staleness(self, state, now=None):
+        if state.assessed_at is None or state.score is None:
+            return NEVER_ASSESSED_SCORE + state.change
+        now = now or time.time()
+        age = max(0.0, now - state.assessed_at)
+        if age < self.min_age_seconds and state.change <= 0:
+            return 0.0
+        traffic = state.traffic * math.exp(-self.traffic_decay * (now - state.traffic_at))
+        weights = self.weights
+        return (weights["age"] * age / (age + self.age_scale)
+                + weights["traffic"] * math.log1p(traffic) / math.log1p(traffic + 100)
+                + weights["band_edge"] * math.exp(-distance_to_band_edge(state.score) / self.edge_scale)
+                + weights["change"] * min(1.0, state.change))
+
+    def _push(self, state, now=None):
+        state.version += 1
+        priority = self.staleness(state, now)
+        if priority > 0:
+            heapq.heappush(self._heap, (-priority, next(self._counter), state.item_id, state.version))
+
+    def _state(self, item_id):
+        state = self.states.get(item_id)
+        if state is None:
+            state = self.states[item_id] = ItemState(item_id)
+        return state
+
+    def record_traffic(self, item_id, count=1):
+        with self._lock:
+            state = self._state(item_id)
+            now = time.time()
+            state.traffic = state.traffic * math.exp(-self.traffic_decay * (now - state.traffic_at)) + count
+            state.traffic_at = now
+            self._push(state, now)
+            if self._touched is not None:
+                self._touched.add(item_id)
+
+    def notify_change(self, item_id, weight=1.0):
+        with self._lock:
+            state = self._state(item_id)
+            state.change += weight
+            self.stats["change_events"] += 1
+            self._push(state)
+            if self._touched is not None:
+                self._touched.add(item_id)
+        self._wakeup.set()
+
+    def notify_category_change(self, category, weight=0.5):
+        with ProductStore(self.db_path) as store:
+            item_ids = [item["id"] for item in store.iter_items(category=category, with_texts=False)]
+        for item_id in item_ids:
+            self.notify_change(item_id, weight)
+
+    def rebuild(self, store):
+        # 扫描数据库和计算优先级都在锁外进行，只在换入新堆时持锁；
+        # 期间到达的访问量和变更事件记在 _touched 中，换入时按最新状态补推
+        cpu_start = time.thread_time()
+        with self._lock:
+            self._touched = set()
+            known_ids = list(self.states)
+        now = time.time()
+        seen = set()
+        new_states = {}
+        changed_ids = []
+        heap = []
+        for item in store.iter_items(with_texts=False):
+            item_id = item["id"]
+            seen.add(item_id)
+            state = self.states.get(item_id)
+            if state is None:
+                state = new_states[item_id] = ItemState(item_id)
+            assessment = item.get("assessment")
+            if assessment is not None:
+                state.assessed_at = assessment["assessed_at"]
+                state.score = assessment["overall_score"]
+            if state.assessed_at is not None and item["updated_at"] > state.assessed_at:
+                changed_ids.append(item_id)
+                continue
+            priority = self.staleness(state, now)
+            if priority > 0:
+                heap.append((-priority, next(self._counter), item_id, state.version))
+        heapq.heapify(heap)
+        removed_ids = [item_id for item_id in known_ids if item_id not in seen]
+
+        with self._lock:
+            touched = self._touched
+            self._touched = None
+            for item_id, state in new_states.items():
+                existing = self.states.setdefault(item_id, state)
+                if existing is not state:
+                    existing.assessed_at = state.assessed_at
+                    existing.score = state.score
+                    touched.add(item_id)
+            for item_id in changed_ids:
+                state = self.states[item_id]
+                state.change = max(state.change, 1.0)
+                touched.add(item_id)
+            for item_id in removed_ids:
+                self.states.pop(item_id, None)
+            self._heap = heap
+            for item_id in touched:
+                state = self.states.get(item_id)
+                if state is not None:
+                    self._push(state, now)
+            self._last_rebuild = time.monotonic()
+            self.stats["rebuilds"] += 1
+            cpu_used = time.thread_time() - cpu_start
+            self.stats["cpu_seconds"] += cpu_used
+        return cpu_used
+
+    def _pop(self):
+        with self._lock:
+            while self._heap:
+                _, _, item_id, version = heapq.heappop(self._heap)
+                state = self.states.get(item_id)
+                if state is not None and state.version == version:
+                    state.version += 1
+                    return state
+        return None
+
+    def reassess(self, store, state):
+        item = store.get_item(state.item_id)
+        if item is None:
+            with self._lock:
+                self.states.pop(state.item_id, None)
+            return None
+        cpu_start = time.thread_time()
+        row = assess_item(self.evaluator, item)
+        cpu_used = time.thread_time() - cpu_start
+        store.save_assessment(state.item_id, row, row["risk_level"])
+        with self._lock:
+            if state.score is not None and map_score_to_level(state.score) != row["risk_level"]:
+                self.stats["band_flips"] += 1
+            state.score = row["overall_score"]
+            state.assessed_at = time.time()
+            state.change = 0.0
+            self.stats["assessed"] += 1
+            self.stats["cpu_seconds"] += cpu_used
+        return cpu_used
+
+    def run(self, duration=None, max_items=None):
+        # CPU 预算按令牌桶计：每秒墙钟时间积累 cpu_budget 秒 CPU，评估消耗实际线程 CPU 时间
+        deadline = time.monotonic() + duration if duration else None
+        with ProductStore(self.db_path) as store:
+            # 重建优先级本身也消耗 CPU，同样从令牌桶里扣除
+            tokens = self.burst_seconds * self.cpu_budget - self.rebuild(store)
+            last = time.monotonic()
+            processed = 0
+            while not self._stop.is_set():
+                now = time.monotonic()
+                if deadline is not None and now >= deadline:
+                    break
+                if max_items is not None and processed >= max_items:
+                    break
+                tokens = min(self.burst_seconds * self.cpu_budget, tokens + (now - last) * self.cpu_budget)
+                last = now
+                if now - self._last_rebuild >= self.rebuild_interval:
+                    tokens -= self.rebuild(store)
+                if tokens <= 0:
+                    self._stop.wait(-tokens / self.cpu_budget)
+                    continue
+
+                state = self._pop()
+                if state is None:
+                    self._wakeup.clear()
+                    timeout = self.rebuild_interval - (time.monotonic() - self._last_rebuild)
+                    if deadline is not None:
+                        timeout = min(timeout, deadline - time.monotonic())
+                    self._wakeup.wait(max(0.0, timeout))
+                    continue
+                cpu_used = self.reassess(store, state)
+                if cpu_used is not None:
+                    tokens -= cpu_used
+                    processed += 1
+        return self.stats
+
+    def start(self, **kwargs):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.run, kwargs=kwargs, name="reassessment-scheduler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def join(self, timeout=None):
+        if self._thread is None:
+            return False
+        self._thread.join(timeout)
+        return self._thread.is_alive()
+
+    def top(self, limit=10):
+        now = time.time()
+        with self._lock:
+            ranked = sorted(self.states.values(), key=lambda state: self.staleness(state, now), reverse=True)
+            return [(state.item_id, self.staleness(state, now)) for state in ranked[:limit]]
+
+
+if __name__ == "__main__":
+    from text_risk_evaluator import TextRiskEvaluator
+
+    parser = argparse.ArgumentParser(description="按陈旧度优先级持续重新评估物品（受 CPU 预算限制）")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help="产品数据库路径")
+    parser.add_argument("--cpu-budget", type=float, default=0.25, help="允许使用的 CPU 比例（1.0 表示一个核心）")
+    parser.add_argument("--rebuild-interval", type=float, default=300.0, help="重新计算全部陈旧度的间隔（秒）")
+    parser.add_argument("--duration", type=float, help="运行时长（秒），默认一直运行")
+    parser.add_argument("--report-interval", type=float, default=60.0, help="打印统计信息的间隔（秒）")
+    args = parser.parse_args()
+
+    scheduler = ReassessmentScheduler(TextRiskEvaluator(), args.db, args.cpu_budget,
+                                      rebuild_interval=args.rebuild_interval)
+    scheduler.start(duration=args.duration)
+    started = time.monotonic()
+    try:
+        while True:
+            running = scheduler.join(args.report_interval)
+            stats = scheduler.stats
+            elapsed = time.monotonic() - started
+            print(f"[{elapsed:7.0f}s] 已重新评估 {stats['assessed']} 个物品，风险等级变化 {stats['band_flips']} 个，"
+                  f"CPU 占用 {stats['cpu_seconds'] / max(elapsed, 1e-9):.1%}，变更事件 {stats['change_events']}")
+            if not running:
+                break
+    except KeyboardInterrupt:
+        pass
+    finally:
+        scheduler.stop()
@@ -0,0 +1,185 @@
+import argparse
+import csv
+import datetime
+import html
+import os
+
+from batch_runner import atomic_open
+from product_store import ProductStore, DEFAULT_DB_PATH
+
+EXPORT_FORMATS = ("csv", "html", "xlsx")
+EXPORT_PAGE_SIZE = 500
+DIMENSION_LABELS = {
+    "exaggeration_sentiment": "过度宣传与情感偏见",
+    "consistency_factuality": "信息一致性与事实核验",
+    "originality_anomaly": "文本原创性与异常模式",
+    "vagueness_detail": "细节缺乏与模糊性",
+}
+RISK_LEVEL_LABELS = {"low": "低风险", "medium": "中等风险", "high": "高风险"}
+# 以这些字符开头的单元格会被电子表格当作公式执行
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+HEADER = ["编号", "名称", "可信度评分", "风险等级"] + list(DIMENSION_LABELS.values()) + ["风险标签", "评估时间"]
+
+HTML_HEAD = """<!DOCTYPE html>
+<html lang="zh-CN">
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<style>
+body {{ font-family: sans-serif; margin: 20px; }}
+table {{ border-collapse: collapse; font-size: 13px; }}
+th, td {{ border: 1px solid #ccc; padding: 4px 8px; text-align: left; }}
+th {{ background: #f0f0f0; position: sticky; top: 0; }}
+tr.high td {{ background: #fde8e8; }}
+tr.medium td {{ background: #fff4e0; }}
+</style>
+</head>
+<body>
+<h1>{title}</h1>
+<p>导出时间：{exported_at}</p>
+<table>
+<thead><tr>{header}</tr></thead>
+<tbody>
+"""
+HTML_TAIL = """</tbody>
+</table>
+</body>
+</html>
+"""
+
+
+class ExportCancelled(Exception):
+    pass
+
+
+def export_format(path, fmt=None):
+    fmt = (fmt or os.path.splitext(path)[1].lstrip(".")).lower()
+    if fmt == "htm":
+        fmt = "html"
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"不支持的导出格式: {fmt or '(无扩展名)'}，可选 {', '.join(EXPORT_FORMATS)}")
+    return fmt
+
+
+def report_row(item):
+    assessment = item["assessment"]
+    dimension_risks = assessment["dimension_risks"]
+    assessed_at = datetime.datetime.fromtimestamp(assessment["assessed_at"]).strftime("%Y-%m-%d %H:%M:%S")
+    return ([item["id"], item["name"], assessment["overall_score"],
+             RISK_LEVEL_LABELS.get(item["risk_level"], item["risk_level"])]
+            + [round(dimension_risks[dim], 3) if dim in dimension_risks else "" for dim in DIMENSION_LABELS]
+            + ["；".join(assessment["risk_labels"]), assessed_at])
+
+
+def spreadsheet_row(item):
+    # 名称和风险标签来自抓取的商品文本，写入 CSV/XLSX 前加 ' 前缀，防止被当作公式执行
+    return [f"'{value}" if isinstance(value, str) and value.startswith(FORMULA_PREFIXES) else value
+            for value in report_row(item)]
+
+
+class CsvReportWriter:
+
+    def __init__(self, f):
+        self.writer = csv.writer(f)
+        self.writer.writerow(HEADER)
+
+    def write_items(self, items):
+        self.writer.writerows(spreadsheet_row(item) for item in items)
+
+    def finish(self):
+        pass
+
+
+class HtmlReportWriter:
+
+    def __init__(self, f, title="评估报告"):
+        self.f = f
+        header = "".join(f"<th>{html.escape(name)}</th>" for name in HEADER)
+        exported_at = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        f.write(HTML_HEAD.format(title=html.escape(title), exported_at=exported_at, header=header))
+
+    def write_items(self, items):
+        self.f.writelines(
+            f'<tr class="{html.escape(item["risk_level"])}">'
+            + "".join(f"<td>{html.escape(str(value))}</td>" for value in report_row(item))
+            + "</tr>\n"
+            for item in items)
+
+    def finish(self):
+        self.f.write(HTML_TAIL)
+
+
+class XlsxReportWriter:
+
+    def __init__(self, f):
+        try:
+            from openpyxl import Workbook
+        except ImportError:
+            raise RuntimeError("导出 XLSX 需要安装 openpyxl（pip install openpyxl）")
+        # write_only 模式逐行写入临时文件，不在内存中保留整张表
+        self.f = f
+        self.workbook = Workbook(write_only=True)
+        self.sheet = self.workbook.create_sheet("评估报告")
+        self.sheet.append(HEADER)
+
+    def write_items(self, items):
+        for item in items:
+            self.sheet.append(spreadsheet_row(item))
+
+    def finish(self):
+        self.workbook.save(self.f)
+
+
+WRITERS = {
+    "csv": (CsvReportWriter, {"mode": "w", "encoding": "utf-8-sig", "newline": ""}),
+    "html": (HtmlReportWriter, {"mode": "w", "encoding": "utf-8"}),
+    "xlsx": (XlsxReportWriter, {"mode": "wb"}),
+}
+
+
+def export_report(store, path, fmt=None, filters=None, page_size=EXPORT_PAGE_SIZE, progress=None,
+                  should_cancel=None):
+    # 过滤条件交给 SQL，逐页读取、逐页写出；取消或出错时不会留下半个文件
+    fmt = export_format(path, fmt)
+    filters = dict(filters or {}, assessed_only=True)
+    total = store.count_matching(**filters)
+    writer_class, open_kwargs = WRITERS[fmt]
+    written = 0
+    if progress is not None:
+        progress(written, total)
+    with atomic_open(path, **open_kwargs) as f:
+        writer = writer_class(f)
+        cursor = 0
+        while cursor is not None:
+            if should_cancel is not None and should_cancel():
+                raise ExportCancelled(f"导出已取消（已处理 {written}/{total} 行）")
+            items, cursor = store.query_page(cursor=cursor, page_size=page_size, with_texts=False, **filters)
+            writer.write_items(items)
+            written += len(items)
+            if progress is not None:
+                progress(written, total)
+        writer.finish()
+    return written
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="把数据库中已评估的物品导出为 CSV/HTML/XLSX 报告")
+    parser.add_argument("output", help="输出文件（按扩展名判断格式）")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help="产品数据库路径")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, help="导出格式（默认按扩展名判断）")
+    parser.add_argument("--category", help="只导出该类别")
+    parser.add_argument("--risk-level", choices=list(RISK_LEVEL_LABELS), help="只导出该风险等级")
+    parser.add_argument("--min-score", type=float, help="最低可信度评分（含）")
+    parser.add_argument("--max-score", type=float, help="最高可信度评分（不含）")
+    parser.add_argument("--page-size", type=int, default=EXPORT_PAGE_SIZE)
+    args = parser.parse_args()
+
+    filters = {"category": args.category, "risk_level": args.risk_level,
+               "min_score": args.min_score, "max_score": args.max_score}
+
+    def print_progress(done, total):
+        print(f"\r已导出 {done}/{total} 行", end="", flush=True)
+
+    with ProductStore(args.db) as store:
+        count = export_report(store, args.output, args.format, filters, args.page_size, print_progress)
+    print(f"\n已导出 {count} 个物品到 {args.output}")
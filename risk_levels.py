@@ -0,0 +1,18 @@
+LOW_RISK_MIN_SCORE = 7.5
+MEDIUM_RISK_MIN_SCORE = 4.5
+
+
+def map_score_to_level(score):
+    if score >= LOW_RISK_MIN_SCORE:
+        return "low"
+    elif score >= MEDIUM_RISK_MIN_SCORE:
+        return "medium"
+    else:
+        return "high"
+
+
+BAND_EDGES = (MEDIUM_RISK_MIN_SCORE, LOW_RISK_MIN_SCORE)
+
+
+def distance_to_band_edge(score):
+    return min(abs(score - edge) for edge in BAND_EDGES)
@@ -0,0 +1,84 @@
+import argparse
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from batch_runner import assess_item
+
+
+def validate_item(item):
+    # 类型不对的输入会让 assess_item 抛异常或给出编造的 0 分，在这里直接返回 400
+    if not isinstance(item, dict):
+        return "请求体必须是 JSON 对象"
+    if not isinstance(item.get("item_text"), str):
+        return "item_text 必须是字符串"
+    if not isinstance(item.get("item_metadata"), (dict, type(None))):
+        return "item_metadata 必须是对象"
+    for field in ("historical_texts", "similar_item_texts"):
+        texts = item.get(field)
+        if texts is not None and not (isinstance(texts, list) and all(isinstance(text, str) for text in texts)):
+            return f"{field} 必须是字符串数组"
+    return None
+
+
+class RiskRequestHandler(BaseHTTPRequestHandler):
+    evaluator = None
+    protocol_version = "HTTP/1.1"
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send_json(200, {"status": "ok", "config_version": self.evaluator.config.version})
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        if self.path != "/assess":
+            self._send_json(404, {"error": "not found"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            item = json.loads(self.rfile.read(length).decode("utf-8"))
+        except (ValueError, UnicodeDecodeError) as e:
+            self._send_json(400, {"error": f"请求体不是合法的 JSON: {e}"})
+            return
+        error = validate_item(item)
+        if error:
+            self._send_json(400, {"error": error})
+            return
+        self._send_json(200, assess_item(self.evaluator, item))
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_server(evaluator, host="127.0.0.1", port=8080):
+    handler = type("BoundRiskRequestHandler", (RiskRequestHandler,), {"evaluator": evaluator})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+if __name__ == "__main__":
+    from text_risk_evaluator import TextRiskEvaluator
+
+    parser = argparse.ArgumentParser(description="文本风险评估 HTTP 服务（POST /assess，GET /health）")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--watch-config", action="store_true", help="监视配置文件并自动重新加载")
+    args = parser.parse_args()
+
+    server = make_server(TextRiskEvaluator(watch_config=args.watch_config), args.host, args.port)
+    print(f"评估服务已启动: http://{args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
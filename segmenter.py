@@ -0,0 +1,221 @@
+import argparse
+import functools
+import hashlib
+import math
+import os
+import re
+
+DEFAULT_DICT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "segmenter_dict.txt")
+DEFAULT_WORD_FREQ = 300
+
+CJK_RANGES = "㐀-䶿一-鿿豈-﫿"
+TOKEN_PATTERN = re.compile(
+    "(?P<cjk>[" + CJK_RANGES + "]+)"
+    "|(?P<word>[a-z0-9]+(?:[-.][a-z0-9]+)*)"
+    "|(?P<other>[^\\W" + CJK_RANGES + "])",
+    re.IGNORECASE,
+)
+CJK_WORD_PATTERN = re.compile("[" + CJK_RANGES + "]+")
+
+
+class DoubleArrayTrie:
+
+    def __init__(self, words):
+        # 高频字分配小编码，子节点编码更集中，双数组更紧凑
+        char_counts = {}
+        for word in words:
+            for char in word:
+                char_counts[char] = char_counts.get(char, 0) + 1
+        self._codes = {char: code for code, char in
+                       enumerate(sorted(char_counts, key=lambda char: (-char_counts[char], char)), 1)}
+
+        root = {}
+        for word, value in words.items():
+            node = root
+            for char in word:
+                node = node.setdefault(self._codes[char], {})
+            node[0] = value
+
+        self.base = [0]
+        self.check = [0]
+        self.value = [None]
+        # 空闲槽位双向链表（0 号槽位是根，兼作链表头），找 base 时只尝试空闲槽位
+        self._next_free = [0]
+        self._prev_free = [0]
+        self._build(root)
+        del self._next_free, self._prev_free
+        size = len(self.check)
+        while size > 1 and self.check[size - 1] < 0:
+            size -= 1
+        del self.base[size:], self.check[size:], self.value[size:]
+
+    def _grow(self, size):
+        old_size = len(self.base)
+        if size <= old_size:
+            return
+        size = max(size, old_size * 2)
+        extra = size - old_size
+        self.base.extend([0] * extra)
+        self.check.extend([-1] * extra)
+        self.value.extend([None] * extra)
+        next_free = self._next_free
+        prev_free = self._prev_free
+        next_free.extend(range(old_size + 1, size + 1))
+        prev_free.extend(range(old_size - 1, size - 1))
+        tail = prev_free[0]
+        next_free[tail] = old_size
+        prev_free[old_size] = tail
+        next_free[size - 1] = 0
+        prev_free[0] = size - 1
+
+    def _unlink(self, slot):
+        next_free = self._next_free
+        prev_free = self._prev_free
+        next_free[prev_free[slot]] = next_free[slot]
+        prev_free[next_free[slot]] = prev_free[slot]
+        prev_free[slot] = -1
+
+    def _occupy(self, slot, state):
+        self.check[slot] = state
+        if self._prev_free[slot] >= 0:
+            self._unlink(slot)
+
+    def _find_base(self, codes):
+        check = self.check
+        first = codes[0]
+        rest = codes[1:]
+        slot = self._next_free[0]
+        while True:
+            if slot == 0:
+                # 空闲槽位用完，扩容后从新增的第一个槽位继续
+                slot = len(check)
+                self._grow(slot + 1)
+            base = slot - first
+            if base >= 1:
+                self._grow(base + codes[-1] + 1)
+                if all(check[base + code] < 0 for code in rest):
+                    return base
+            # 放不下的空闲槽位不再作为候选（仍可被其他节点的子节点占用），每个槽位最多被尝试一次，建树时间随词典线性增长
+            next_slot = self._next_free[slot]
+            self._unlink(slot)
+            slot = next_slot
+
+    def _build(self, root):
+        stack = [(0, root)]
+        while stack:
+            state, node = stack.pop()
+            self.value[state] = node.get(0)
+            codes = sorted(code for code in node if code)
+            if not codes:
+                continue
+            base = self._find_base(codes)
+            self.base[state] = base
+            for code in codes:
+                self._occupy(base + code, state)
+            for code in codes:
+                stack.append((base + code, node[code]))
+
+    def prefixes(self, text, start):
+        state = 0
+        codes = self._codes
+        base = self.base
+        check = self.check
+        value = self.value
+        size = len(check)
+        for end in range(start, len(text)):
+            code = codes.get(text[end])
+            if code is None:
+                return
+            target = base[state] + code
+            if target >= size or check[target] != state:
+                return
+            state = target
+            if value[state] is not None:
+                yield end + 1, value[state]
+
+
+class Segmenter:
+
+    def __init__(self, word_freqs):
+        total = sum(word_freqs.values())
+        self.word_count = len(word_freqs)
+        self.unknown_logp = math.log(1 / total)
+        self.trie = DoubleArrayTrie({word: math.log(freq / total) for word, freq in word_freqs.items()})
+
+    def cut(self, text, stop_words=None):
+        # 输出一律小写（TF-IDF 依赖这一点关闭了 lowercase 预处理），stop_words 需为小写词集合
+        tokens = []
+        for match in TOKEN_PATTERN.finditer(text.lower()):
+            if match.lastgroup == "cjk":
+                tokens.extend(self._cut_cjk(match.group()))
+            else:
+                tokens.append(match.group())
+        if stop_words:
+            return [token for token in tokens if token not in stop_words]
+        return tokens
+
+    def _cut_cjk(self, run):
+        length = len(run)
+        best = [0.0] * (length + 1)
+        ends = [length] * (length + 1)
+        unknown_logp = self.unknown_logp
+        prefixes = self.trie.prefixes
+        for start in range(length - 1, -1, -1):
+            best_score = unknown_logp + best[start + 1]
+            best_end = start + 1
+            for end, logp in prefixes(run, start):
+                score = logp + best[end]
+                if score > best_score:
+                    best_score = score
+                    best_end = end
+            best[start] = best_score
+            ends[start] = best_end
+
+        words = []
+        start = 0
+        while start < length:
+            words.append(run[start:ends[start]])
+            start = ends[start]
+        return words
+
+
+def read_dictionary(path):
+    word_freqs = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            parts = line.split()
+            freq = int(parts[1]) if len(parts) > 1 else DEFAULT_WORD_FREQ
+            word_freqs[parts[0].lower()] = max(1, freq)
+    return word_freqs
+
+
+def dictionary_hash(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+# 缓存键包含词典内容哈希，词典文件被修改后会重新建树
+@functools.lru_cache(maxsize=8)
+def _cached_segmenter(path, content_hash, extra_words):
+    word_freqs = read_dictionary(path)
+    for word in extra_words:
+        word_freqs.setdefault(word, DEFAULT_WORD_FREQ)
+    return Segmenter(word_freqs)
+
+
+def load_segmenter(path=DEFAULT_DICT_PATH, extra_words=(), content_hash=None):
+    path = os.path.abspath(path)
+    extra = tuple(sorted({word.lower() for word in extra_words if CJK_WORD_PATTERN.fullmatch(word)}))
+    return _cached_segmenter(path, content_hash or dictionary_hash(path), extra)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="基于词典的中文分词")
+    parser.add_argument("text", help="要分词的文本")
+    parser.add_argument("--dict", default=DEFAULT_DICT_PATH, help="分词词典路径")
+    args = parser.parse_args()
+
+    print(" / ".join(load_segmenter(args.dict).cut(args.text)))
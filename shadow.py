@@ -0,0 +1,190 @@
+import argparse
+import copy
+import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from batch_runner import atomic_write_text
+from evaluator_config import DIMENSIONS, load_config
+from risk_levels import map_score_to_level
+
+LEVELS = ["low", "medium", "high"]
+DELTA_BUCKETS = [-5.0, -2.0, -1.0, -0.5, -0.1, 0.1, 0.5, 1.0, 2.0, 5.0]
+
+
+def candidate_evaluator(primary, config_path):
+    candidate = copy.copy(primary)
+    candidate.config_path = config_path
+    candidate.config_watcher = None
+    candidate.swap_config(load_config(config_path))
+    return candidate
+
+
+class ShadowReport:
+
+    def __init__(self, top_n=20):
+        self.top_n = top_n
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+        self.requests = 0
+        self.sampled = 0
+        self.dropped = 0
+        self.errors = 0
+        self.compared = 0
+        self.delta_sum = 0.0
+        self.abs_delta_sum = 0.0
+        self.changed = 0
+        self.delta_histogram = [0] * (len(DELTA_BUCKETS) + 1)
+        self.band_matrix = {primary: {candidate: 0 for candidate in LEVELS} for primary in LEVELS}
+        self.dimension_sum = {dim: 0.0 for dim in DIMENSIONS}
+        self.dimension_abs_sum = {dim: 0.0 for dim in DIMENSIONS}
+        self.dimension_changed = {dim: 0 for dim in DIMENSIONS}
+        self.largest = []
+        self.primary_version = None
+        self.candidate_version = None
+
+    def count(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def add(self, item_id, primary, candidate):
+        delta = round(candidate["overall_score"] - primary["overall_score"], 1)
+        primary_level = map_score_to_level(primary["overall_score"])
+        candidate_level = map_score_to_level(candidate["overall_score"])
+        bucket = sum(1 for edge in DELTA_BUCKETS if delta >= edge)
+        with self._lock:
+            self.primary_version = primary.get("config_version")
+            self.candidate_version = candidate.get("config_version")
+            self.compared += 1
+            self.delta_sum += delta
+            self.abs_delta_sum += abs(delta)
+            self.changed += delta != 0
+            self.delta_histogram[bucket] += 1
+            self.band_matrix[primary_level][candidate_level] += 1
+            for dim in DIMENSIONS:
+                diff = round(candidate["dimension_risks"].get(dim, 0.0) - primary["dimension_risks"].get(dim, 0.0), 2)
+                self.dimension_sum[dim] += diff
+                self.dimension_abs_sum[dim] += abs(diff)
+                self.dimension_changed[dim] += diff != 0
+            if delta != 0:
+                self.largest.append({"item_id": item_id, "primary_score": primary["overall_score"],
+                                     "candidate_score": candidate["overall_score"], "delta": delta,
+                                     "primary_level": primary_level, "candidate_level": candidate_level})
+                if len(self.largest) > self.top_n * 2:
+                    self._trim_largest()
+
+    def _trim_largest(self):
+        self.largest.sort(key=lambda row: -abs(row["delta"]))
+        del self.largest[self.top_n:]
+
+    def to_dict(self):
+        with self._lock:
+            self._trim_largest()
+            compared = self.compared or 1
+            flips = sum(count for primary, row in self.band_matrix.items()
+                        for candidate, count in row.items() if primary != candidate)
+            labels = [f"< {DELTA_BUCKETS[0]}"]
+            labels += [f"[{low}, {high})" for low, high in zip(DELTA_BUCKETS, DELTA_BUCKETS[1:])]
+            labels.append(f">= {DELTA_BUCKETS[-1]}")
+            return {
+                "primary_version": self.primary_version,
+                "candidate_version": self.candidate_version,
+                "started_at": self.started_at,
+                "updated_at": time.time(),
+                "requests": self.requests,
+                "sampled": self.sampled,
+                "dropped": self.dropped,
+                "errors": self.errors,
+                "compared": self.compared,
+                "score_delta": {
+                    "mean": self.delta_sum / compared,
+                    "mean_abs": self.abs_delta_sum / compared,
+                    "changed": self.changed,
+                    "histogram": dict(zip(labels, self.delta_histogram)),
+                },
+                "band_flips": flips,
+                "band_flip_rate": flips / compared,
+                "band_matrix": copy.deepcopy(self.band_matrix),
+                "dimensions": {dim: {"mean_diff": self.dimension_sum[dim] / compared,
+                                     "mean_abs_diff": self.dimension_abs_sum[dim] / compared,
+                                     "changed": self.dimension_changed[dim]} for dim in DIMENSIONS},
+                "largest_deltas": list(self.largest),
+            }
+
+    def save(self, path):
+        atomic_write_text(path, json.dumps(self.to_dict(), ensure_ascii=False, indent=2))
+
+
+class ShadowEvaluator:
+
+    def __init__(self, primary, candidate, sample_rate=0.1, max_workers=1, max_pending=256, report=None, seed=None):
+        self.primary = primary
+        self.candidate = candidate
+        self.sample_rate = sample_rate
+        self.report = report if report else ShadowReport()
+        self._random = random.Random(seed)
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="shadow")
+
+    @property
+    def config(self):
+        return self.primary.config
+
+    def config_fingerprint(self):
+        return self.primary.config_fingerprint()
+
+    def assess(self, item_text, item_metadata=None, historical_texts=None, similar_item_texts=None,
+               item_id=None, similar_item_ids=None, return_features=False, analysis=None):
+        if item_text and analysis is None:
+            analysis = self.primary.config.analyze(item_text)
+        kwargs = dict(item_text=item_text, item_metadata=item_metadata, historical_texts=historical_texts,
+                      similar_item_texts=similar_item_texts, item_id=item_id, similar_item_ids=similar_item_ids,
+                      analysis=analysis)
+        result = self.primary.assess(return_features=return_features, **kwargs)
+        self.report.count("requests")
+        if item_text and self._random.random() < self.sample_rate:
+            if self._slots.acquire(blocking=False):
+                self.report.count("sampled")
+                self._executor.submit(self._shadow, result, kwargs)
+            else:
+                self.report.count("dropped")
+        return result
+
+    def _shadow(self, primary_result, kwargs):
+        try:
+            candidate_result = self.candidate.assess(**kwargs)
+            self.report.add(kwargs["item_id"], primary_result, candidate_result)
+        except Exception as e:
+            print(f"影子评估出错: {e}")
+            self.report.count("errors")
+        finally:
+            self._slots.release()
+
+    def close(self, wait=True):
+        self._executor.shutdown(wait=wait)
+
+
+if __name__ == "__main__":
+    from batch_runner import assess_item
+    from product_store import ProductStore, DEFAULT_DB_PATH
+    from text_risk_evaluator import TextRiskEvaluator
+
+    parser = argparse.ArgumentParser(description="按比例抽样的影子评估：对比候选配置与当前配置的评分差异")
+    parser.add_argument("candidate_config", help="候选评估器配置文件")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help="产品数据库路径")
+    parser.add_argument("--rate", type=float, default=0.1, help="进入影子评估的请求比例")
+    parser.add_argument("--report", default="shadow_report.json", help="报告输出路径")
+    args = parser.parse_args()
+
+    primary = TextRiskEvaluator()
+    shadow = ShadowEvaluator(primary, candidate_evaluator(primary, args.candidate_config), args.rate)
+    with ProductStore(args.db) as store:
+        for item in store.iter_items():
+            assess_item(shadow, item)
+    shadow.close()
+    shadow.report.save(args.report)
+    report = shadow.report.to_dict()
+    print(f"共 {report['requests']} 个请求，影子评估 {report['compared']} 个，丢弃 {report['dropped']} 个；"
+          f"平均评分变化 {report['score_delta']['mean']:+.2f}，风险等级变化 {report['band_flips']} 个。报告已写入 {args.report}")
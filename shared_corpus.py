@@ -0,0 +1,160 @@
+import bisect
+import mmap
+import os
+import shutil
+import struct
+import sys
+import tempfile
+from array import array
+
+MAGIC = b"TRCORP01"
+HEADER = struct.Struct("<8sQQQ")
+INT64 = struct.Struct("<q")
+
+
+def _write_int64(out, values):
+    # array 按本机字节序存储，文件格式固定为小端
+    if sys.byteorder != "little":
+        values.byteswap()
+    values.tofile(out)
+
+
+def write_corpus(path, entries):
+    # ID、起止位置和文本偏移用紧凑的 array('q') 保存，避免为每个文本分配一个 Python int
+    ids = array("q")
+    starts = array("q")
+    counts = array("q")
+    text_offsets = array("q", [0])
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, blob_path = tempfile.mkstemp(prefix=".corpus-blob-", dir=directory)
+    tmp_path = path + ".tmp"
+    try:
+        with os.fdopen(fd, "wb") as blob:
+            for item_id, texts in entries:
+                start = len(text_offsets) - 1
+                for text in texts:
+                    encoded = text.encode("utf-8")
+                    blob.write(encoded)
+                    text_offsets.append(text_offsets[-1] + len(encoded))
+                ids.append(int(item_id))
+                starts.append(start)
+                counts.append(len(text_offsets) - 1 - start)
+
+        if any(ids[i] > ids[i + 1] for i in range(len(ids) - 1)):
+            order = sorted(range(len(ids)), key=ids.__getitem__)
+            ids = array("q", (ids[i] for i in order))
+            starts = array("q", (starts[i] for i in order))
+            counts = array("q", (counts[i] for i in order))
+        for i in range(len(ids) - 1):
+            if ids[i] == ids[i + 1]:
+                raise ValueError(f"语料中存在重复的物品 ID: {ids[i]}")
+
+        with open(tmp_path, "wb") as out:
+            out.write(HEADER.pack(MAGIC, len(ids), len(text_offsets) - 1, text_offsets[-1]))
+            for values in (ids, starts, counts, text_offsets):
+                _write_int64(out, values)
+            with open(blob_path, "rb") as blob:
+                shutil.copyfileobj(blob, out, 1 << 20)
+            out.flush()
+            os.fsync(out.fileno())
+        os.replace(tmp_path, path)
+    finally:
+        os.unlink(blob_path)
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+    return len(ids)
+
+
+class SharedCorpus:
+
+    def __init__(self, path):
+        self.path = path
+        self._open()
+
+    def _open(self):
+        with open(self.path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        buffer = memoryview(self._mmap)
+        magic, n_items, n_texts, blob_len = HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{self.path} 不是有效的共享语料文件")
+
+        offset = HEADER.size
+        self._ids = buffer[offset:offset + 8 * n_items].cast("q")
+        offset += 8 * n_items
+        self._starts = buffer[offset:offset + 8 * n_items].cast("q")
+        offset += 8 * n_items
+        self._counts = buffer[offset:offset + 8 * n_items].cast("q")
+        offset += 8 * n_items
+        self._text_offsets = buffer[offset:offset + 8 * (n_texts + 1)].cast("q")
+        offset += 8 * (n_texts + 1)
+        self._blob = buffer[offset:offset + blob_len]
+
+    def close(self):
+        for view in (self._ids, self._starts, self._counts, self._text_offsets, self._blob):
+            view.release()
+        self._mmap.close()
+
+    def __getstate__(self):
+        return {"path": self.path}
+
+    def __setstate__(self, state):
+        self.path = state["path"]
+        self._open()
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __contains__(self, item_id):
+        return self._position(item_id) is not None
+
+    def item_ids(self):
+        return iter(self._ids)
+
+    def _position(self, item_id):
+        position = bisect.bisect_left(self._ids, item_id)
+        if position < len(self._ids) and self._ids[position] == item_id:
+            return position
+        return None
+
+    def _text_range(self, item_id):
+        position = self._position(item_id)
+        if position is None:
+            return range(0)
+        start = self._starts[position]
+        return range(start, start + self._counts[position])
+
+    def views(self, item_id):
+        offsets = self._text_offsets
+        return [self._blob[offsets[i]:offsets[i + 1]] for i in self._text_range(item_id)]
+
+    def texts(self, item_id):
+        return [str(view, "utf-8") for view in self.views(item_id)]
+
+    def first_text(self, item_id):
+        text_range = self._text_range(item_id)
+        if not text_range:
+            return None
+        i = text_range[0]
+        return str(self._blob[self._text_offsets[i]:self._text_offsets[i + 1]], "utf-8")
+
+    def last_text(self, item_id):
+        text_range = self._text_range(item_id)
+        if not text_range:
+            return None
+        i = text_range[-1]
+        return str(self._blob[self._text_offsets[i]:self._text_offsets[i + 1]], "utf-8")
+
+
+if __name__ == "__main__":
+    from product_store import ProductStore, DEFAULT_DB_PATH
+
+    if len(sys.argv) < 2:
+        print("用法: python shared_corpus.py <输出文件> [item_text|historical|similar] [数据库路径]")
+        sys.exit(1)
+    output_path = sys.argv[1]
+    kind = sys.argv[2] if len(sys.argv) > 2 else "item_text"
+    db_path = sys.argv[3] if len(sys.argv) > 3 else DEFAULT_DB_PATH
+    with ProductStore(db_path) as store:
+        count = store.export_corpus(output_path, kind)
+    print(f"已写入 {count} 个物品的语料到 {output_path}")
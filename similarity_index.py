@@ -0,0 +1,206 @@
+import numpy as np
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.random_projection import SparseRandomProjection
+
+
+class HashedTextEmbedder:
+
+    def __init__(self, n_features=2 ** 18, n_components=128, ngram_range=(2, 3), random_state=42):
+        self.vectorizer = HashingVectorizer(
+            analyzer="char_wb", ngram_range=ngram_range, n_features=n_features,
+            alternate_sign=False, norm="l2", lowercase=True)
+        self.projection = SparseRandomProjection(
+            n_components=n_components, dense_output=True, random_state=random_state)
+        self.projection.fit(np.zeros((1, n_features)))
+        self.dim = n_components
+
+    def embed(self, texts):
+        vectors = np.asarray(self.projection.transform(self.vectorizer.transform(texts)), dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+
+class SimilarityIndex:
+
+    def __init__(self, embedder=None, n_lists=64, n_probe=8, train_size=None,
+                 max_candidates=4096, keep_texts=True, retrain_factor=2.0, random_state=42):
+        self.embedder = embedder if embedder else HashedTextEmbedder()
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.train_size = train_size if train_size else n_lists * 40
+        self.max_candidates = max_candidates
+        self.keep_texts = keep_texts
+        self.retrain_factor = retrain_factor
+        self._rng = np.random.default_rng(random_state)
+
+        self._vectors = np.zeros((1024, self.embedder.dim), dtype=np.float32)
+        self._row_ids = []
+        self._row_of = {}
+        self._free_rows = []
+        self._texts = {}
+        self.centroids = None
+        self._trained_size = 0
+        self._row_list = np.full(1024, -1, dtype=np.int32)
+        self._lists = []
+        self._pos_in_list = {}
+
+    def __len__(self):
+        return len(self._row_of)
+
+    def __contains__(self, item_id):
+        return item_id in self._row_of
+
+    def text(self, item_id):
+        return self._texts.get(item_id)
+
+    def add(self, item_id, text):
+        self.add_many([(item_id, text)])
+
+    def add_many(self, items):
+        # 同一批中重复的 id 只保留最后一条，否则先分配的行会变成无主的孤行
+        items = list(dict(items).items())
+        if not items:
+            return
+        for item_id, _ in items:
+            if item_id in self._row_of:
+                self.remove(item_id)
+        vectors = self.embedder.embed([text for _, text in items])
+        for (item_id, text), vector in zip(items, vectors):
+            row = self._allocate_row()
+            self._vectors[row] = vector
+            self._row_ids[row] = item_id
+            self._row_of[item_id] = row
+            if self.keep_texts:
+                self._texts[item_id] = text
+            if self.centroids is not None:
+                self._assign(row, int(np.argmax(self.centroids @ vector)))
+
+        if self.needs_training():
+            self.train()
+
+    def remove(self, item_id):
+        row = self._row_of.pop(item_id, None)
+        if row is None:
+            return False
+        self._texts.pop(item_id, None)
+        self._unassign(row)
+        self._row_ids[row] = None
+        self._free_rows.append(row)
+        return True
+
+    def needs_training(self):
+        # 只用最早的一批物品训练的质心会逐渐偏离后来的数据分布，规模按倍数增长后重新训练
+        if self.centroids is None:
+            return len(self) >= self.train_size
+        return len(self) >= self._trained_size * self.retrain_factor
+
+    def train(self, iterations=10):
+        rows = np.fromiter(self._row_of.values(), dtype=np.int64, count=len(self._row_of))
+        if len(rows) < self.n_lists:
+            return False
+        sample = rows if len(rows) <= self.train_size else self._rng.choice(rows, self.train_size, replace=False)
+        data = self._vectors[sample]
+        centroids = data[self._rng.choice(len(data), self.n_lists, replace=False)].copy()
+        for _ in range(iterations):
+            assignment = np.argmax(data @ centroids.T, axis=1)
+            for list_no in range(self.n_lists):
+                members = data[assignment == list_no]
+                if len(members):
+                    centroid = members.mean(axis=0)
+                    norm = np.linalg.norm(centroid)
+                    centroids[list_no] = centroid / norm if norm > 0 else centroid
+
+        self.centroids = centroids
+        self._trained_size = len(rows)
+        self._lists = [[] for _ in range(self.n_lists)]
+        self._pos_in_list = {}
+        self._row_list[:] = -1
+        assignment = np.argmax(self._vectors[rows] @ centroids.T, axis=1)
+        for row, list_no in zip(rows.tolist(), assignment.tolist()):
+            self._assign(row, list_no)
+        return True
+
+    def query(self, text, k=5, exclude_ids=()):
+        if not self._row_of:
+            return []
+        vector = self.embedder.embed([text])[0]
+        candidates = self._candidate_rows(vector)
+        if len(candidates) == 0:
+            return []
+
+        scores = self._vectors[candidates] @ vector
+        wanted = min(len(candidates), k + len(exclude_ids))
+        top = np.argpartition(-scores, wanted - 1)[:wanted]
+        top = top[np.argsort(-scores[top])]
+        results = []
+        for index in top:
+            item_id = self._row_ids[candidates[index]]
+            if item_id in exclude_ids:
+                continue
+            results.append((item_id, float(scores[index])))
+            if len(results) == k:
+                break
+        return results
+
+    def _candidate_rows(self, vector):
+        if self.centroids is None:
+            return np.fromiter(self._row_of.values(), dtype=np.int64, count=len(self._row_of))
+        probe_order = np.argsort(-(self.centroids @ vector))[:self.n_probe]
+        candidates = []
+        total = 0
+        for list_no in probe_order:
+            members = self._lists[list_no]
+            if not members:
+                continue
+            candidates.append(np.asarray(members[:self.max_candidates - total], dtype=np.int64))
+            total += len(candidates[-1])
+            if total >= self.max_candidates:
+                break
+        return np.concatenate(candidates) if candidates else np.empty(0, dtype=np.int64)
+
+    def _allocate_row(self):
+        if self._free_rows:
+            return self._free_rows.pop()
+        row = len(self._row_ids)
+        if row >= len(self._vectors):
+            capacity = len(self._vectors) * 2
+            self._vectors = np.resize(self._vectors, (capacity, self.embedder.dim))
+            row_list = np.full(capacity, -1, dtype=np.int32)
+            row_list[:len(self._row_list)] = self._row_list
+            self._row_list = row_list
+        self._row_ids.append(None)
+        return row
+
+    def _assign(self, row, list_no):
+        members = self._lists[list_no]
+        self._pos_in_list[row] = len(members)
+        members.append(row)
+        self._row_list[row] = list_no
+
+    def _unassign(self, row):
+        list_no = self._row_list[row]
+        if list_no < 0:
+            return
+        members = self._lists[list_no]
+        position = self._pos_in_list.pop(row)
+        last = members.pop()
+        if last != row:
+            members[position] = last
+            self._pos_in_list[last] = position
+        self._row_list[row] = -1
+
+
+def build_similarity_index(store, **kwargs):
+    index = SimilarityIndex(**kwargs)
+    batch = []
+    for item in store.iter_items(with_texts=False):
+        batch.append((item["id"], item["item_text"]))
+        if len(batch) >= 1000:
+            index.add_many(batch)
+            batch = []
+    index.add_many(batch)
+    # 最后用全部物品重新训练一次，避免质心只反映较早读入的部分
+    if len(index) > index._trained_size:
+        index.train()
+    return index
@@ -0,0 +1,86 @@
+import json
+import os
+import re
+
+DEFAULT_RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "consistency_rules.json")
+
+
+class SpecRule:
+
+    def __init__(self, spec_key, definition):
+        self.spec_key = spec_key
+        self.type = definition.get("type", "numeric")
+        self.unit = definition.get("unit")
+        self.match = definition.get("match", "first")
+        self.on_missing = definition.get("on_missing", "ignore")
+        self.severity = definition.get("severity", "soft")
+        self.risk = float(definition.get("risk", 0.2))
+        self.label = definition["label"]
+        tolerance = definition.get("tolerance", {})
+        self.absolute_tolerance = float(tolerance.get("absolute", 0))
+        self.relative_tolerance = float(tolerance.get("relative", 0))
+        self.pattern = re.compile(definition["pattern"], re.IGNORECASE) if definition.get("pattern") else None
+        self.scale = float(definition.get("scale", 1))
+
+        if self.type not in ("numeric", "mention"):
+            raise ValueError(f"规格规则 '{spec_key}' 的类型无效: {self.type}")
+        if self.type == "numeric" and not self.unit and not self.pattern:
+            raise ValueError(f"数值规格规则 '{spec_key}' 需要指定 unit 或 pattern")
+        if self.severity not in ("hard", "soft"):
+            raise ValueError(f"规格规则 '{spec_key}' 的严重程度无效: {self.severity}")
+
+    def _found_values(self, analysis):
+        if self.pattern is not None:
+            return [float(match.group(1).replace(",", "")) * self.scale
+                    for match in self.pattern.finditer(analysis.text)]
+        return [fact.value for fact in analysis.facts_of(self.unit)]
+
+    def check(self, expected, analysis):
+        if self.type == "mention":
+            if str(expected).lower() in analysis.text_lower:
+                return None
+            return self.label.format(expected=expected)
+
+        if isinstance(expected, bool) or not isinstance(expected, (int, float)):
+            return None
+        found = self._found_values(analysis)
+        if not found:
+            if self.on_missing == "violation":
+                return self.label.format(expected=expected, found=float("nan"))
+            return None
+
+        allowed = max(self.absolute_tolerance, abs(expected) * self.relative_tolerance)
+        candidates = found[:1] if self.match == "first" else found
+        for value in candidates:
+            if abs(value - expected) <= allowed:
+                return None
+        return self.label.format(expected=expected, found=candidates[0])
+
+
+class SpecRuleTable:
+
+    def __init__(self, units, rules):
+        self.units = units
+        self.rules = rules
+
+    def __len__(self):
+        return len(self.rules)
+
+    def applicable(self, specs):
+        hard, soft = [], []
+        for key, expected in specs.items():
+            rule = self.rules.get(key)
+            if rule is None or expected is None or expected == "":
+                continue
+            (hard if rule.severity == "hard" else soft).append((rule, expected))
+        return hard, soft
+
+
+def compile_spec_rules(definition):
+    rules = {key: SpecRule(key, rule) for key, rule in definition.get("rules", {}).items()}
+    return SpecRuleTable(definition.get("units", {}), rules)
+
+
+def load_spec_rules(path=DEFAULT_RULES_PATH):
+    with open(path, "r", encoding="utf-8") as f:
+        return compile_spec_rules(json.load(f))
@@ -0,0 +1,10 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "slow: 运行时间较长的测试，可用 -m \"not slow\" 跳过")
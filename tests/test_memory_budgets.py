@@ -0,0 +1,34 @@
+import json
+
+import pytest
+
+from check_memory_budgets import BUDGETS_PATH, check, run_size
+
+
+@pytest.fixture(scope="module")
+def budgets():
+    with open(BUDGETS_PATH, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+@pytest.fixture(scope="module")
+def evaluator():
+    from text_risk_evaluator import TextRiskEvaluator
+
+    return TextRiskEvaluator()
+
+
+def assert_within_budget(evaluator, budgets, size):
+    budget = budgets["runs"][size]
+    measured = run_size(evaluator, int(size), budget["traced"])
+    failures = check(measured, budget, budgets["tolerance"])
+    assert not failures, f"{size} 个物品的内存超出预算: {', '.join(failures)}（实测 {measured}）"
+
+
+def test_memory_budget_1k(evaluator, budgets):
+    assert_within_budget(evaluator, budgets, "1000")
+
+
+@pytest.mark.slow
+def test_memory_budget_100k(evaluator, budgets):
+    assert_within_budget(evaluator, budgets, "100000")
@@ -0,0 +1,147 @@
+import re
+from collections import namedtuple
+
+from tracing import NULL_TRACE
+
+NumericFact = namedtuple("NumericFact", ["value", "unit", "span", "raw"])
+
+CURRENCY_UNIT = "currency"
+WORD_PATTERN = re.compile(r"\w+")
+
+DEFAULT_UNITS = {
+    "speed_mbps": {"MB/s": 1},
+    "hours": {"小时": 1, "hours": 1},
+}
+
+
+class NumericFactExtractor:
+
+    def __init__(self, units=None):
+        self.units = units if units else DEFAULT_UNITS
+        self._alias_units = {}
+        for unit, aliases in self.units.items():
+            for alias, scale in aliases.items():
+                self._alias_units[alias.lower()] = (unit, scale)
+
+        aliases = sorted(self._alias_units, key=len, reverse=True)
+        unit_pattern = "|".join(re.escape(alias) for alias in aliases) or "(?!)"
+        self.pattern = re.compile(
+            r"(?P<currency>[$€£¥￥])\s?(?P<price>\d{1,3}(?:,\d{3})+(?:\.\d{1,2})?|\d+(?:\.\d{1,2})?)"
+            r"|(?<!\d)(?<!\d\.)(?P<number>\d+(?:\.\d+)?)(?!\d)(?:\s?(?P<unit>" + unit_pattern + ")(?![a-z]))?",
+            re.IGNORECASE,
+        )
+
+    def extract(self, text, offset=0):
+        facts = []
+        for match in self.pattern.finditer(text):
+            price = match.group("price")
+            if price is not None:
+                facts.append(NumericFact(float(price.replace(",", "")), CURRENCY_UNIT,
+                                         (match.start("price") + offset, match.end("price") + offset), price))
+                continue
+
+            number = match.group("number")
+            alias = match.group("unit")
+            if alias is None:
+                facts.append(NumericFact(float(number), None, (match.start() + offset, match.end() + offset), number))
+            else:
+                unit, scale = self._alias_units[alias.lower()]
+                facts.append(NumericFact(float(number) * scale, unit,
+                                         (match.start() + offset, match.end() + offset), match.group(0)))
+        return facts
+
+
+CHUNK_BOUNDARIES = ("\n", "。", "！", "？", ". ", "! ", "? ", "；", "; ", "，", ", ", " ")
+
+
+def chunk_spans(text, chunk_chars):
+    start = 0
+    length = len(text)
+    while start < length:
+        end = min(length, start + chunk_chars)
+        if end < length:
+            for boundary in CHUNK_BOUNDARIES:
+                cut = text.rfind(boundary, start + chunk_chars // 2, end)
+                if cut >= 0:
+                    end = cut + len(boundary)
+                    break
+        yield start, end
+        start = end
+
+
+def sample_evenly(sequence, limit):
+    if len(sequence) <= limit:
+        return list(sequence)
+    if limit == 1:
+        return [sequence[0]]
+    step = (len(sequence) - 1) / (limit - 1)
+    return [sequence[round(i * step)] for i in range(limit)]
+
+
+def originality_sample(chunks, sample_chars):
+    per_chunk = max(1, sample_chars // len(chunks))
+    return "\n".join(chunk[:per_chunk] for chunk in chunks)[:sample_chars]
+
+
+def sample_comparison_text(text, long_document):
+    # 相似文本、历史文本和物品文本一样按长文本规则抽样，避免它们让单个物品的耗时随输入长度增长
+    if len(text) <= long_document["threshold_chars"]:
+        return text
+    spans = sample_evenly(list(chunk_spans(text, long_document["chunk_chars"])), long_document["max_chunks"])
+    return originality_sample([text[start:end] for start, end in spans], long_document["originality_sample_chars"])
+
+
+class TextAnalysis:
+
+    def __init__(self, text, extractor, long_document=None, segmenter=None, key=None, trace=NULL_TRACE):
+        self.key = key
+        self.tokenize = segmenter.cut if segmenter else WORD_PATTERN.findall
+        self.original_length = len(text)
+        self.total_chunks = 1
+        self.chunks = None
+        if long_document and len(text) > long_document["threshold_chars"]:
+            self._analyze_chunks(text, extractor, long_document, trace)
+            return
+
+        self.text = text
+        self.text_lower = text.lower()
+        with trace.span("segment", chars=len(text)) as span:
+            self.words = self.tokenize(self.text_lower)
+            span.set_attribute("words", len(self.words))
+        with trace.span("fact_regex", chars=len(text)) as span:
+            self.facts = extractor.extract(text)
+            span.set_attribute("facts", len(self.facts))
+        self.originality_text = text
+        self.prefix_text = text
+        self.token_count = len(self.words)
+
+    def _analyze_chunks(self, text, extractor, long_document, trace):
+        spans = list(chunk_spans(text, long_document["chunk_chars"]))
+        self.total_chunks = len(spans)
+        self.chunks = [text[start:end] for start, end in sample_evenly(spans, long_document["max_chunks"])]
+        self.words = []
+        self.facts = []
+        lowered = []
+        offset = 0
+        for chunk in self.chunks:
+            chunk_lower = chunk.lower()
+            lowered.append(chunk_lower)
+            with trace.span("segment", chars=len(chunk)):
+                self.words.extend(self.tokenize(chunk_lower))
+            with trace.span("fact_regex", chars=len(chunk)):
+                self.facts.extend(extractor.extract(chunk, offset))
+            offset += len(chunk) + 1
+        self.text = "\n".join(self.chunks)
+        self.text_lower = "\n".join(lowered)
+
+        sample_chars = long_document["originality_sample_chars"]
+        self.originality_text = originality_sample(self.chunks, sample_chars)
+        self.prefix_text = text[:sample_chars]
+        self.token_count = round(len(self.words) * self.original_length / max(1, len(self.text)))
+
+    @property
+    def is_sampled(self):
+        return self.chunks is not None
+
+    def facts_of(self, unit):
+        return [fact for fact in self.facts if fact.unit == unit]
@@ -1,10 +1,15 @@
-import re
 import nltk
 from nltk.sentiment.vader import SentimentIntensityAnalyzer
-from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS, TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
 import Levenshtein
 import statistics
+import functools
+import hashlib
+import json
+from text_analysis import CURRENCY_UNIT, sample_comparison_text
+from evaluator_config import DEFAULT_CONFIG_PATH, ConfigWatcher, load_config
+from tracing import NULL_TRACE
 
 try:
     nltk.data.find('sentiment/vader_lexicon.zip')
@@ -14,48 +19,46 @@ except LookupError:
 
 class TextRiskEvaluator:
 
-    def __init__(self, category_baselines=None):
+    def __init__(self, category_baselines=None, reference_corpus=None, history_corpus=None,
+                 similarity_index=None, similar_top_k=3, config_path=DEFAULT_CONFIG_PATH, watch_config=False,
+                 tracer=None):
         self.sentiment_analyzer = SentimentIntensityAnalyzer()
         self.category_baselines = category_baselines if category_baselines else {}
-
-        self.exaggeration_keywords = {
-            "惊艳", "完美", "令人难以置信", "难以置信", "革命性", "必备", "神器", "全能",
-            "游戏规则改变者", "无瑕", "史上最佳", "终极", "奇迹", "无与伦比", "轰动", "绝对", "效果惊人",
-            "amazing", "perfect", "incredible", "unbelievable", "revolutionary",
-            "must-have", "game-changer", "flawless", "best ever", "ultimate",
-            "miracle", "unparalleled", "sensational", "absolutely", "stunning", "fantastic"
-        }
-        self.vague_keywords = {
-             "好", "不错", "很棒", "极好", "有效", "高质量", "优秀", "卓越", "显著", "轻松", "智能",
-             "方便", "强大", "全面",
-             "great", "nice", "good", "wonderful", "fantastic", "effective", "easy", "smart",
-             "high-quality", "excellent", "superb", "significant", "powerful", "comprehensive"
-        }
-        self.suspicious_claim_keywords = {
-            "能量", "量子", "保证", "运势", "风水", "磁疗", "红外线",
-            "宇宙", "奇迹", "根治", "特效", "永恒"
+        self.reference_corpus = reference_corpus
+        self.history_corpus = history_corpus
+        self.similarity_index = similarity_index
+        self.similar_top_k = similar_top_k
+        self.tracer = tracer
+
+        self.config_path = config_path
+        self.config = load_config(config_path)
+        self.config_watcher = ConfigWatcher(self, config_path).start() if watch_config else None
+
+    def swap_config(self, config):
+        self.config = config
+
+    def config_fingerprint(self):
+        config = {
+            "config_version": self.config.version,
+            "category_baselines": self.category_baselines,
+            "similar_top_k": self.similar_top_k if self.similarity_index is not None else None,
         }
+        encoded = json.dumps(config, sort_keys=True, ensure_ascii=False).encode("utf-8")
+        return hashlib.sha256(encoded).hexdigest()[:16]
 
-        self.dimension_weights = {
-            "exaggeration_sentiment": 0.35,
-            "consistency_factuality": 0.30,
-            "originality_anomaly": 0.15,
-            "vagueness_detail": 0.20,
-        }
-        self.sentiment_deviation_threshold = 0.3
-        self.exaggeration_freq_threshold = 0.015
-        self.similarity_threshold = 0.8
-        self.vagueness_ratio_threshold = 0.08
-        self.suspicious_keywords_threshold = 2
-        self.min_numbers_electronics = 3
-
-    def _assess_sentiment_exaggeration(self, item_text, category=None):
+    def _assess_sentiment_exaggeration(self, config, analysis, category=None, features=None, trace=NULL_TRACE):
         risk_score = 0.0
         labels = []
         sentiment = None
 
         try:
-            sentiment = self.sentiment_analyzer.polarity_scores(item_text)['compound']
+            with trace.span("vader", chars=len(analysis.text), chunks=len(analysis.chunks or [analysis.text])):
+                if analysis.is_sampled:
+                    weighted = sum(self.sentiment_analyzer.polarity_scores(chunk)['compound'] * len(chunk)
+                                   for chunk in analysis.chunks)
+                    sentiment = weighted / sum(len(chunk) for chunk in analysis.chunks)
+                else:
+                    sentiment = self.sentiment_analyzer.polarity_scores(analysis.text)['compound']
         except Exception as e:
             print(f"情感分析时出错: {e}")
             labels.append("情感分析失败")
@@ -65,7 +68,7 @@ class TextRiskEvaluator:
         if category and category in self.category_baselines:
             baseline_sentiment = self.category_baselines[category].get('avg_sentiment')
             if baseline_sentiment is not None and sentiment is not None:
-                if sentiment > baseline_sentiment + self.sentiment_deviation_threshold:
+                if sentiment > baseline_sentiment + config.sentiment_deviation_threshold:
                     risk_score += 0.3
                     labels.append(f"情感得分 ({sentiment:.2f}) 显著高于类别平均值 ({baseline_sentiment:.2f})")
             elif sentiment is not None and sentiment > 0.90:
@@ -75,15 +78,22 @@ class TextRiskEvaluator:
             risk_score += 0.2
             labels.append(f"情感得分 ({sentiment:.2f}) 极度正向。")
 
-        words = re.findall(r'\b\w+\b', item_text.lower())
+        words = analysis.words
+        if features is not None:
+            features['sentiment'] = sentiment
+            features['baseline_sentiment'] = baseline_sentiment
+            features['word_count'] = len(words)
+            features['exaggeration_count'] = 0
         if not words:
              dim_risk = min(1.0, risk_score)
              return dim_risk, labels, sentiment
 
-        exaggeration_count = sum(1 for word in words if word in self.exaggeration_keywords)
+        exaggeration_count = sum(1 for word in words if word in config.exaggeration_keywords)
         exaggeration_freq = exaggeration_count / len(words)
+        if features is not None:
+            features['exaggeration_count'] = exaggeration_count
 
-        if exaggeration_freq > self.exaggeration_freq_threshold :
+        if exaggeration_freq > config.exaggeration_freq_threshold :
             risk_score += 0.8
             labels.append(f"【高风险】检测到高频率 ({exaggeration_freq:.2%}) 的过度宣传关键词 ({exaggeration_count}个)。")
         elif exaggeration_count >= 3:
@@ -97,65 +107,53 @@ class TextRiskEvaluator:
         dim_risk = min(1.0, risk_score)
         return dim_risk, labels, sentiment
 
-    def _assess_consistency(self, item_text, item_metadata):
+    def _assess_consistency(self, config, analysis, item_metadata, features=None, trace=NULL_TRACE):
         risk_score = 0.0
         labels = []
         consistency_penalty = 0
 
         if not item_metadata:
+            if features is not None:
+                features['metadata_missing'] = True
             return 0.1, ["元数据缺失，无法进行详细一致性检查"]
 
-        text_prices = re.findall(r'[$€£¥]\s?(\d{1,3}(?:,\d{3})*(?:\.\d{1,2})?|\d+(?:\.\d{1,2})?)', item_text)
+        text_prices = analysis.facts_of(CURRENCY_UNIT)
         metadata_price = item_metadata.get('price')
         if text_prices and metadata_price is not None:
-            try:
-                text_price_val = float(text_prices[0].replace(',', ''))
-                if abs(text_price_val - metadata_price) > max(metadata_price * 0.1, 50):
-                    risk_score = max(risk_score, 0.9)
-                    consistency_penalty = 1
-                    labels.append(f"【高风险】文本价格 ('{text_prices[0]}') 与元数据价格 ({metadata_price}) 严重不符。")
-            except ValueError:
-                labels.append("无法解析文本中找到的价格以进行比较。")
-
-        metadata_specs = item_metadata.get('specs', {})
-        metadata_speed = metadata_specs.get('read_speed_mbps')
-        text_speeds = re.findall(r'(\d{3,})\s?MB/s', item_text, re.IGNORECASE)
-        if text_speeds and metadata_speed is not None:
-            try:
-                text_speed_val = int(text_speeds[0])
-                if abs(text_speed_val - metadata_speed) > metadata_speed * 0.2:
-                    risk_score = max(risk_score, 0.9)
+            text_price_val = text_prices[0].value
+            if abs(text_price_val - metadata_price) > max(metadata_price * 0.1, 50):
+                risk_score = max(risk_score, 0.9)
+                consistency_penalty = 1
+                labels.append(f"【高风险】文本价格 ('{text_prices[0].raw}') 与元数据价格 ({metadata_price}) 严重不符。")
+
+        hard_rules, soft_rules = config.spec_rules.applicable(item_metadata.get('specs', {}))
+        with trace.span("spec_rules", hard_rules=len(hard_rules), soft_rules=len(soft_rules)):
+            for rule, expected in hard_rules:
+                violation = rule.check(expected, analysis)
+                if violation:
+                    risk_score = max(risk_score, rule.risk)
                     consistency_penalty = 1
-                    labels.append(f"【高风险】文本宣称速度 ({text_speed_val}MB/s) 与元数据规格 ({metadata_speed}MB/s) 严重不符。")
-            except ValueError:
-                 labels.append("无法解析文本中找到的速度值。")
+                    labels.append(violation)
 
-        if consistency_penalty == 0:
-            metadata_color = metadata_specs.get('color')
-            if metadata_color and metadata_color.lower() not in item_text.lower():
-                risk_score += 0.15
-                labels.append(f"元数据中的颜色 ('{metadata_color}') 在描述中未提及。")
-
-            metadata_battery = metadata_specs.get('battery_life_hours')
-            if metadata_battery:
-                 text_hours = re.findall(r'(\d{1,2})\s?(?:小时|hours)', item_text)
-                 found_match = False
-                 for h in text_hours:
-                     if abs(int(h) - metadata_battery) <= 2:
-                         found_match = True
-                         break
-                 if not found_match:
-                     risk_score += 0.2
-                     labels.append(f"文本中提及的续航时间与元数据 ({metadata_battery}小时) 不符或未明确提及。")
-
-        suspicious_count = 0
-        words_lower = item_text.lower()
-        for keyword in self.suspicious_claim_keywords:
-            if keyword in words_lower:
-                 suspicious_count += 1
+            if consistency_penalty == 0:
+                for rule, expected in soft_rules:
+                    violation = rule.check(expected, analysis)
+                    if violation:
+                        risk_score += rule.risk
+                        labels.append(violation)
+
+        with trace.span("suspicious_regex", chars=len(analysis.text_lower)):
+            suspicious_count = config.count_suspicious_keywords(analysis.text_lower)
         category = item_metadata.get('category', '').lower()
         price = metadata_price if metadata_price is not None else 0
-        if suspicious_count >= self.suspicious_keywords_threshold and (price > 500 or category == 'accessories'):
+        if features is not None:
+            features['metadata_missing'] = False
+            features['consistency_penalty'] = bool(consistency_penalty)
+            features['spec_risk'] = risk_score
+            features['suspicious_count'] = suspicious_count
+            features['price'] = price
+            features['is_accessories'] = category == 'accessories'
+        if suspicious_count >= config.suspicious_keywords_threshold and (price > 500 or category == 'accessories'):
             risk_score += 0.5
             labels.append(f"文本包含多个可疑或无法验证的声明关键词 ({suspicious_count}个)，结合价格/类别判断风险较高。")
         elif suspicious_count > 0:
@@ -166,22 +164,44 @@ class TextRiskEvaluator:
         dim_risk = min(1.0, risk_score)
         return dim_risk, labels
 
-    def _assess_originality_anomaly(self, item_text, historical_texts, similar_item_texts, category=None):
+    def _assess_originality_anomaly(self, config, analysis, historical_texts, similar_item_texts, category=None,
+                                    item_id=None, similar_item_ids=None, features=None, trace=NULL_TRACE):
         risk_score = 0.0
         labels = []
-        text_length = len(item_text.split())
+        item_text = analysis.originality_text
+        text_length = analysis.token_count
+
+        if not similar_item_texts and not similar_item_ids and self.similarity_index is not None:
+            with trace.span("similarity_query", k=self.similar_top_k, index_size=len(self.similarity_index)):
+                neighbours = self.similarity_index.query(item_text, k=self.similar_top_k,
+                                                         exclude_ids={item_id} if item_id is not None else ())
+            similar_item_ids = [neighbour_id for neighbour_id, _ in neighbours]
+            if self.reference_corpus is None:
+                similar_item_texts = [text for text in map(self.similarity_index.text, similar_item_ids) if text]
+        if not similar_item_texts and similar_item_ids and self.reference_corpus is not None:
+            similar_item_texts = [text for text in map(self.reference_corpus.first_text, similar_item_ids) if text]
+        if not historical_texts and item_id is not None and self.history_corpus is not None:
+            last_historical_text = self.history_corpus.last_text(item_id)
+            historical_texts = [last_historical_text] if last_historical_text else []
 
         if similar_item_texts:
+            similar_item_texts = [sample_comparison_text(text, config.long_document) for text in similar_item_texts]
             corpus = [item_text] + similar_item_texts
             try:
-                vectorizer = TfidfVectorizer(stop_words='english')
-                tfidf_matrix = vectorizer.fit_transform(corpus)
-                cosine_sims = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:])
+                with trace.span("tfidf", documents=len(corpus), chars=sum(len(text) for text in corpus)):
+                    # 停用词在分词时直接过滤，避免每次新建的 vectorizer 都把整张停用词表重新分词做一致性检查。
+                    # lowercase=False 只有在分词器输出已是小写时才正确：Segmenter.cut 先把整段文本转成小写再切分
+                    tokenizer = functools.partial(config.segmenter.cut, stop_words=ENGLISH_STOP_WORDS)
+                    vectorizer = TfidfVectorizer(tokenizer=tokenizer, token_pattern=None, lowercase=False)
+                    tfidf_matrix = vectorizer.fit_transform(corpus)
+                    cosine_sims = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:])
                 avg_similarity = cosine_sims.mean() if cosine_sims.size > 0 else 0
-                if avg_similarity > self.similarity_threshold:
+                if features is not None:
+                    features['avg_similarity'] = float(avg_similarity)
+                if avg_similarity > config.similarity_threshold:
                     risk_score += 0.6
                     labels.append(f"与相似物品的平均相似度过高 ({avg_similarity:.2f})，可能是模板化文本。")
-                elif avg_similarity > self.similarity_threshold * 0.7:
+                elif avg_similarity > config.similarity_threshold * 0.7:
                     risk_score += 0.2
                     labels.append(f"与相似物品的平均相似度较高 ({avg_similarity:.2f})。")
             except ValueError as e:
@@ -190,9 +210,17 @@ class TextRiskEvaluator:
 
         if historical_texts:
             last_historical_text = historical_texts[-1]
-            edit_dist = Levenshtein.distance(item_text, last_historical_text)
-            max_len = max(len(item_text), len(last_historical_text))
+            compared_text = analysis.prefix_text
+            if analysis.is_sampled or len(last_historical_text) > config.long_document["threshold_chars"]:
+                compared_text = compared_text[:config.long_document["originality_sample_chars"]]
+                last_historical_text = last_historical_text[:len(compared_text)]
+            with trace.span("levenshtein", chars=len(compared_text), historical_chars=len(last_historical_text)):
+                edit_dist = Levenshtein.distance(compared_text, last_historical_text)
+            max_len = max(len(compared_text), len(last_historical_text))
             normalized_distance = edit_dist / max_len if max_len > 0 else 0
+            if features is not None:
+                features['history_max_len'] = max_len
+                features['history_distance'] = normalized_distance
             if max_len > 30 and 0 < normalized_distance < 0.10:
                 risk_score += 0.15
                 labels.append(f"与上一版本相比改动较小 (距离: {normalized_distance:.2%})。")
@@ -201,6 +229,8 @@ class TextRiskEvaluator:
             baseline_length = self.category_baselines[category].get('avg_length')
             if baseline_length and baseline_length > 0:
                 length_ratio = text_length / baseline_length
+                if features is not None:
+                    features['length_ratio'] = length_ratio
                 if length_ratio < 0.2 or length_ratio > 5.0:
                     risk_score += 0.2
                     labels.append(f"文本长度 ({text_length} 词) 与类别平均长度 ({baseline_length} 词) 相比异常。")
@@ -208,17 +238,19 @@ class TextRiskEvaluator:
         dim_risk = min(1.0, risk_score)
         return dim_risk, labels
 
-    def _assess_vagueness(self, item_text, category=None):
+    def _assess_vagueness(self, config, analysis, category=None, features=None, trace=NULL_TRACE):
         risk_score = 0.0
         labels = []
 
-        words = re.findall(r'\b\w+\b', item_text.lower())
+        words = analysis.words
         if not words: return 0.0, ["文本为空或不包含标准单词。"]
 
-        vague_count = sum(1 for word in words if word in self.vague_keywords)
+        vague_count = sum(1 for word in words if word in config.vague_keywords)
         vagueness_ratio = vague_count / len(words)
+        if features is not None:
+            features['vague_count'] = vague_count
 
-        if vagueness_ratio > self.vagueness_ratio_threshold:
+        if vagueness_ratio > config.vagueness_ratio_threshold:
             risk_score += 0.7
             labels.append(f"【中高风险】检测到高比例 ({vagueness_ratio:.2%}) 的模糊关键词 ({vague_count}个)。")
         elif vague_count >= 3:
@@ -228,9 +260,11 @@ class TextRiskEvaluator:
             risk_score += 0.15
             labels.append(f"检测到少量 ({vague_count}个) 模糊关键词。")
 
-        numbers_found = re.findall(r'\b\d+(?:\.\d+)?\b', item_text)
-        num_digits = len(numbers_found)
-        expected_digits = self.min_numbers_electronics if category and category.lower() in ['electronics', 'computers', 'hardware'] else 1
+        num_digits = len(analysis.facts)
+        if features is not None:
+            features['number_count'] = num_digits
+            features['is_electronics'] = bool(category and category.lower() in ['electronics', 'computers', 'hardware'])
+        expected_digits = config.min_numbers_electronics if category and category.lower() in ['electronics', 'computers', 'hardware'] else 1
 
         if num_digits < expected_digits:
              risk_score += 0.5
@@ -239,18 +273,51 @@ class TextRiskEvaluator:
         dim_risk = min(1.0, risk_score)
         return dim_risk, labels
 
-    def assess(self, item_text, item_metadata=None, historical_texts=None, similar_item_texts=None):
+    def assess(self, item_text, item_metadata=None, historical_texts=None, similar_item_texts=None,
+               item_id=None, similar_item_ids=None, return_features=False, analysis=None):
+        config = self.config
+        if self.tracer is None:
+            return self._assess(config, NULL_TRACE, item_text, item_metadata, historical_texts, similar_item_texts,
+                                item_id, similar_item_ids, return_features, analysis)
+        trace = self.tracer.start_trace("assess", item_id=item_id, text_chars=len(item_text or ""),
+                                        config_version=config.version)
+        try:
+            result = self._assess(config, trace, item_text, item_metadata, historical_texts, similar_item_texts,
+                                  item_id, similar_item_ids, return_features, analysis)
+        finally:
+            trace.finish()
+        if trace.trace_id is not None:
+            result['trace_id'] = trace.trace_id
+        return result
+
+    def _assess(self, config, trace, item_text, item_metadata, historical_texts, similar_item_texts,
+                item_id, similar_item_ids, return_features, analysis):
         if not item_text:
-            return {'overall_score': 0, 'dimension_risks': {}, 'risk_labels': ["输入文本为空。"], 'raw_sentiment': None}
+            result = {'overall_score': 0, 'dimension_risks': {}, 'risk_labels': ["输入文本为空。"], 'raw_sentiment': None,
+                      'config_version': config.version}
+            if return_features:
+                result['features'] = {'empty_text': True}
+            return result
 
         category = item_metadata.get('category') if item_metadata else None
         historical_texts = historical_texts or []
         similar_item_texts = similar_item_texts or []
 
-        risk_senti, labels_senti, raw_sentiment = self._assess_sentiment_exaggeration(item_text, category)
-        risk_cons, labels_cons = self._assess_consistency(item_text, item_metadata)
-        risk_orig, labels_orig = self._assess_originality_anomaly(item_text, historical_texts, similar_item_texts, category)
-        risk_vague, labels_vague = self._assess_vagueness(item_text, category)
+        features = {'empty_text': False} if return_features else None
+        if analysis is None or analysis.key != config.analysis_key:
+            with trace.span("text_analysis", chars=len(item_text)):
+                analysis = config.analyze(item_text, trace)
+        with trace.span("exaggeration_sentiment", words=len(analysis.words)):
+            risk_senti, labels_senti, raw_sentiment = self._assess_sentiment_exaggeration(
+                config, analysis, category, features, trace)
+        with trace.span("consistency_factuality", facts=len(analysis.facts)):
+            risk_cons, labels_cons = self._assess_consistency(config, analysis, item_metadata, features, trace)
+        with trace.span("originality_anomaly", historical_texts=len(historical_texts),
+                        similar_item_texts=len(similar_item_texts)):
+            risk_orig, labels_orig = self._assess_originality_anomaly(config, analysis, historical_texts, similar_item_texts,
+                                                                      category, item_id, similar_item_ids, features, trace)
+        with trace.span("vagueness_detail", words=len(analysis.words)):
+            risk_vague, labels_vague = self._assess_vagueness(config, analysis, category, features, trace)
 
         dimension_risks = {
             "exaggeration_sentiment": risk_senti,
@@ -259,13 +326,16 @@ class TextRiskEvaluator:
             "vagueness_detail": risk_vague,
         }
 
-        total_weighted_risk = sum(dimension_risks[dim] * self.dimension_weights[dim]
+        total_weighted_risk = sum(dimension_risks[dim] * config.dimension_weights[dim]
                                   for dim in dimension_risks)
 
         max_score = 10
         overall_score = max(0, max_score - total_weighted_risk * max_score)
 
         all_labels = labels_senti + labels_cons + labels_orig + labels_vague
+        if analysis.is_sampled:
+            all_labels.append(f"长文本模式：文本共 {analysis.original_length} 字符，按 {analysis.total_chunks} 个分块中均匀抽取的 "
+                              f"{len(analysis.chunks)} 个分块评估。")
         labeled_risks = []
         for label in all_labels:
              if "【高风险】" in label or "【中高风险】" in label:
@@ -276,12 +346,16 @@ class TextRiskEvaluator:
                  labeled_risks.append(f"【低风险提示】{label}" if "【" not in label else label)
 
 
-        return {
+        result = {
             'overall_score': round(overall_score, 1),
             'dimension_risks': {k: round(v, 2) for k, v in dimension_risks.items()},
             'risk_labels': labeled_risks,
-            'raw_sentiment': round(raw_sentiment, 3) if raw_sentiment is not None else None
+            'raw_sentiment': round(raw_sentiment, 3) if raw_sentiment is not None else None,
+            'config_version': config.version
         }
+        if return_features:
+            result['features'] = features
+        return result
 
 if __name__ == "__main__":
     baselines = {
@@ -291,65 +365,13 @@ if __name__ == "__main__":
         "Accessories": {"avg_sentiment": 0.2, "avg_length": 50}
     }
     evaluator = TextRiskEvaluator(category_baselines=baselines)
-    PRODUCT_SOURCE_DATA = [
-         {
-            "name": "智能降噪耳机 Pro",
-            "item_text": "采用最新主动降噪技术，有效隔绝环境噪音，提供沉浸式纯净音频体验。人体工学设计，佩戴舒适。单次充电可提供长达20小时的播放时间。支持蓝牙5.2快速连接。",
-            "item_metadata": {"category": "Electronics", "price": 899.00, "specs": {"color": "星空灰", "battery_life_hours": 20, "bluetooth": "5.2"}},
-            "historical_texts": ["新款降噪耳机，提供沉浸式体验，续航20小时。"],
-            "similar_item_texts": [
-                "体验极致降噪，享受音乐本真。XX品牌耳机，续航18小时。",
-                "高性能无线耳机，智能降噪，舒适佩戴。",
-                "专注于音质，主动降噪耳机，电池耐用。"
-            ]
-        },
-        {
-            "name": "“全能王”家用清洁机器人 X1",
-            "item_text": "革命性的家庭清洁解决方案！这款全能王机器人简直是完美！能轻松搞定地毯、地板等所有地面。智能路径规划，覆盖无死角。绝对是现代家庭的必备神器！效果惊人！",
-            "item_metadata": {"category": "Electronics", "price": 2599.00, "specs": {"function": "扫拖一体", "navigation": "LDS激光导航"}},
-            "historical_texts": ["新型扫地机器人，智能规划路径。"],
-            "similar_item_texts": [
-                "智能扫拖机器人，解放双手，高效清洁。",
-                "XX扫地机，激光导航，弓字形清扫。",
-                "家用全自动清洁器，适用于多种地面。"
-            ]
-        },
-        {
-            "name": "神秘量子能量手环",
-            "item_text": "快来佩戴这款独一无二的神秘量子能量手环，即刻感受源自宇宙深处的强大能量！它能显著改善您的健康状况，提升个人运势，带来难以置信的好运！效果保证，无与伦比！全球限量发售，机会难得！",
-            "item_metadata": {"category": "Accessories", "price": 1999.00, "specs": {"material": "未知特殊材质"}},
-            "historical_texts": ["能量手环，改善健康。"],
-            "similar_item_texts": [
-                "健康磁力手链，促进血液循环。",
-                "平衡能量项链，带来身心和谐。",
-                "稀有宝石手串，据说有特殊功效。"
-            ]
-        },
-        {
-            "name": "经典款纯棉T恤 (多色)",
-            "item_text": "基础款男士圆领T恤。选用100%优质长绒棉，面料柔软亲肤，吸湿透气性好，穿着舒适。经典合身版型，不易变形。提供黑色、白色、灰色、藏青色等多种颜色选择。尺码范围：S-XXL。",
-            "item_metadata": {"category": "Apparel", "price": 79.00, "specs": {"material": "100%棉", "neck_style": "圆领", "colors": ["黑", "白", "灰", "藏青"], "sizes": ["S", "M", "L", "XL", "XXL"]}},
-            "historical_texts": ["纯棉T恤，多色可选。"],
-            "similar_item_texts": [
-                "夏季男士纯色T恤，舒适透气。",
-                "基础款棉质上衣，适合日常穿着。",
-                "圆领短袖T恤，简约百搭。"
-            ]
-        },
-         {
-            "name": "超高速SSD固态硬盘 1TB",
-            "item_text": "体验闪电般的启动速度和文件传输！这款固态硬盘读取速度高达惊人的 5000MB/s。采用最新 NVMe 协议，性能卓越。容量1TB，足够存储大量游戏和文件。仅售 $599!",
-            "item_metadata": {"category": "Electronics", "price": 799.00, "specs": {"capacity_gb": 1000, "interface": "NVMe PCIe 4.0", "read_speed_mbps": 3500}},
-            "historical_texts": ["1TB NVMe SSD, 高速读写。"],
-            "similar_item_texts": [
-                "大容量固态硬盘，提升电脑性能。",
-                "NVMe SSD，速度快，稳定性好。",
-                "1TB 存储硬盘，适用于游戏和工作站。"
-            ]
-        }
-    ]
+    from product_store import ProductStore, SAMPLE_PRODUCTS
+
+    store = ProductStore(":memory:")
+    store.seed(SAMPLE_PRODUCTS)
+
     print("--- 再次优化后评分机制测试 ---")
-    for product in PRODUCT_SOURCE_DATA:
+    for product in store.iter_items():
         print(f"\n--- 评估物品: {product['name']} ---")
         assessment = evaluator.assess(
             item_text=product.get("item_text", ""),
@@ -0,0 +1,181 @@
+import argparse
+import json
+import os
+import random
+import threading
+import time
+import weakref
+
+DEFAULT_TRACE_PATH = os.path.join("traces", "assess_trace.json")
+
+
+class _NullSpan:
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set_attribute(self, key, value):
+        pass
+
+
+class _NullTrace:
+    trace_id = None
+
+    def span(self, name, **attributes):
+        return NULL_SPAN
+
+    def finish(self):
+        pass
+
+
+NULL_SPAN = _NullSpan()
+NULL_TRACE = _NullTrace()
+
+
+class Span:
+
+    def __init__(self, trace, name, attributes):
+        self.trace = trace
+        self.name = name
+        self.attributes = attributes
+        self.span_id = "%016x" % trace.tracer.random.getrandbits(64)
+        self.parent_span_id = None
+        self.status = "OK"
+        self.start_us = 0
+        self.duration_us = 0
+        self._start_ns = 0
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def __enter__(self):
+        stack = self.trace.stack
+        self.parent_span_id = stack[-1].span_id if stack else None
+        stack.append(self)
+        self.start_us = time.time_ns() // 1000
+        self._start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.duration_us = (time.perf_counter_ns() - self._start_ns) / 1000
+        if exc_type is not None:
+            self.status = "ERROR"
+            self.attributes["exception.type"] = exc_type.__name__
+            self.attributes["exception.message"] = str(exc)
+        self.trace.stack.pop()
+        self.trace.spans.append(self)
+        return False
+
+    def to_event(self, trace_id, pid, tid):
+        args = {"trace_id": trace_id, "span_id": self.span_id, "parent_span_id": self.parent_span_id,
+                "status": self.status}
+        args.update(self.attributes)
+        return {"name": self.name, "cat": "assess", "ph": "X", "ts": self.start_us, "dur": self.duration_us,
+                "pid": pid, "tid": tid, "args": args}
+
+
+class Trace:
+
+    def __init__(self, tracer, name, attributes):
+        self.tracer = tracer
+        self.trace_id = "%032x" % tracer.random.getrandbits(128)
+        self.stack = []
+        self.spans = []
+        self.root = Span(self, name, attributes).__enter__()
+
+    def span(self, name, **attributes):
+        return Span(self, name, attributes)
+
+    def finish(self):
+        self.root.__exit__(None, None, None)
+        self.tracer.write(self)
+
+
+def process_trace_path(path, pid):
+    root, ext = os.path.splitext(path)
+    return f"{root}.{pid}{ext}"
+
+
+class Tracer:
+
+    def __init__(self, path=DEFAULT_TRACE_PATH, sample_rate=0.01, max_bytes=50 * 1024 * 1024, backup_count=3,
+                 seed=None):
+        self.path = path
+        self.sample_rate = sample_rate
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.seed = seed
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._init_process()
+        _TRACERS.add(self)
+
+    def _init_process(self):
+        # 每个进程使用自己的随机数状态和追踪文件：fork 出的工作进程否则会生成相同的 trace_id 和采样决定，
+        # 并在各自的锁下轮转同一个文件
+        pid = os.getpid()
+        self.random = random.Random(None if self.seed is None else f"{self.seed}:{pid}")
+        self.file_path = process_trace_path(self.path, pid)
+        self._lock = threading.Lock()
+
+    def start_trace(self, name, force=False, **attributes):
+        if not force and self.random.random() >= self.sample_rate:
+            return NULL_TRACE
+        return Trace(self, name, attributes)
+
+    def write(self, trace):
+        pid = os.getpid()
+        tid = threading.get_native_id()
+        lines = "".join(json.dumps(span.to_event(trace.trace_id, pid, tid), ensure_ascii=False, default=str) + ",\n"
+                        for span in trace.spans)
+        with self._lock:
+            if os.path.exists(self.file_path) and os.path.getsize(self.file_path) + len(lines) > self.max_bytes:
+                self._rotate()
+            # Chrome trace 的 JSON 数组格式允许省略结尾的 ]，因此可以一直追加写入
+            with open(self.file_path, "a", encoding="utf-8") as f:
+                if f.tell() == 0:
+                    f.write("[\n")
+                f.write(lines)
+
+    def _rotate(self):
+        for index in range(self.backup_count - 1, 0, -1):
+            source = f"{self.file_path}.{index}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.file_path}.{index + 1}")
+        if self.backup_count > 0:
+            os.replace(self.file_path, f"{self.file_path}.1")
+        else:
+            os.unlink(self.file_path)
+
+
+_TRACERS = weakref.WeakSet()
+
+
+def _after_fork_in_child():
+    for tracer in list(_TRACERS):
+        tracer._init_process()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
+if __name__ == "__main__":
+    from product_store import SAMPLE_PRODUCTS
+    from text_risk_evaluator import TextRiskEvaluator
+
+    parser = argparse.ArgumentParser(description="对示例物品的评估过程生成 Chrome/Perfetto 可打开的追踪文件")
+    parser.add_argument("--output", default=DEFAULT_TRACE_PATH, help="追踪文件路径（实际文件名会加上进程号）")
+    parser.add_argument("--rate", type=float, default=1.0, help="头部采样比例")
+    args = parser.parse_args()
+
+    tracer = Tracer(args.output, args.rate)
+    evaluator = TextRiskEvaluator(tracer=tracer)
+    for product in SAMPLE_PRODUCTS:
+        result = evaluator.assess(product["item_text"], product["item_metadata"], product.get("historical_texts"),
+                                  product.get("similar_item_texts"))
+        print(f"{product['name']}: 评分 {result['overall_score']}  trace_id {result.get('trace_id')}")
+    print(f"追踪已写入 {tracer.file_path}，可在 chrome://tracing 或 ui.perfetto.dev 中打开。")
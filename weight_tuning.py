@@ -0,0 +1,190 @@
+import argparse
+import itertools
+
+import numpy as np
+
+from evaluator_config import DIMENSIONS, THRESHOLD_KEYS
+from feature_store import FeatureStore, load_features
+from risk_levels import LOW_RISK_MIN_SCORE, MEDIUM_RISK_MIN_SCORE
+
+THRESHOLD_PARAMS = THRESHOLD_KEYS
+LEVELS = ["low", "medium", "high"]
+
+DEFAULT_GRID = {
+    "exaggeration_freq_threshold": [0.01, 0.015, 0.02, 0.03, 0.05],
+    "vagueness_ratio_threshold": [0.05, 0.08, 0.1, 0.15],
+    "similarity_threshold": [0.6, 0.7, 0.8, 0.9],
+    "weight:exaggeration_sentiment": [0.25, 0.35, 0.45],
+    "weight:consistency_factuality": [0.2, 0.3, 0.4],
+}
+
+
+def params_from_evaluator(evaluator):
+    config = evaluator.config
+    params = {name: getattr(config, name) for name in THRESHOLD_PARAMS}
+    for dim in DIMENSIONS:
+        params[f"weight:{dim}"] = config.dimension_weights[dim]
+    return params
+
+
+def apply_params(evaluator, params):
+    evaluator.swap_config(evaluator.config.with_overrides(params))
+
+
+def _param(params, name):
+    return np.asarray(params[name], dtype=np.float64).reshape(-1, 1)
+
+
+def round_one_decimal(values):
+    # 与内置 round(x, 1) 逐位一致：x*10 用 x*8 + x*2 的 TwoSum 精确表示后再判断舍入方向
+    a = values * 8
+    b = values * 2
+    s = a + b
+    bb = s - a
+    err = (a - (s - bb)) + (b - bb)
+    k = np.floor(s)
+    k = np.where((s == k) & (err < 0), k - 1, k)
+    d = (s - (k + 0.5)) + err
+    return np.where(d > 0, k + 1, np.where(d < 0, k, k + k % 2)) / 10
+
+
+def rescore(features, params):
+    col = {name: features[name][None, :] for name in features if name not in ("item_ids", "overall_score")}
+    words = col["word_count"]
+    has_words = words > 0
+    safe_words = np.where(has_words, words, 1)
+
+    sentiment = col["sentiment"]
+    baseline = col["baseline_sentiment"]
+    senti = np.where(
+        ~np.isnan(baseline),
+        np.where(sentiment > baseline + _param(params, "sentiment_deviation_threshold"), 0.3, 0.0),
+        np.where(sentiment > 0.90, 0.2, 0.0))
+    exaggeration = col["exaggeration_count"]
+    exaggeration_term = np.where(
+        exaggeration / safe_words > _param(params, "exaggeration_freq_threshold"), 0.8,
+        np.where(exaggeration >= 3, 0.6, np.where(exaggeration >= 1, 0.3, 0.0)))
+    risk_senti = np.minimum(1.0, senti + np.where(has_words, exaggeration_term, 0.0))
+
+    suspicious = col["suspicious_count"]
+    suspicious_term = np.where(
+        (suspicious >= _param(params, "suspicious_keywords_threshold")) & ((col["price"] > 500) | (col["is_accessories"] == 1)),
+        0.5, np.where(suspicious > 0, 0.1, 0.0))
+    risk_cons = np.where(col["metadata_missing"] == 1, 0.1, np.minimum(1.0, col["spec_risk"] + suspicious_term))
+
+    similarity = col["avg_similarity"]
+    similarity_threshold = _param(params, "similarity_threshold")
+    similarity_term = np.where(similarity > similarity_threshold, 0.6,
+                               np.where(similarity > similarity_threshold * 0.7, 0.2, 0.0))
+    distance = col["history_distance"]
+    history_term = np.where((col["history_max_len"] > 30) & (distance > 0) & (distance < 0.10), 0.15, 0.0)
+    ratio = col["length_ratio"]
+    length_term = np.where((ratio < 0.2) | (ratio > 5.0), 0.2, 0.0)
+    risk_orig = np.minimum(1.0, similarity_term + history_term + length_term)
+
+    vague = col["vague_count"]
+    vague_term = np.where(
+        vague / safe_words > _param(params, "vagueness_ratio_threshold"), 0.7,
+        np.where(vague >= 3, 0.4, np.where(vague >= 1, 0.15, 0.0)))
+    expected_numbers = np.where(col["is_electronics"] == 1, _param(params, "min_numbers_electronics"), 1)
+    number_term = np.where(col["number_count"] < expected_numbers, 0.5, 0.0)
+    risk_vague = np.where(has_words, np.minimum(1.0, vague_term + number_term), 0.0)
+
+    total = (risk_senti * _param(params, "weight:exaggeration_sentiment")
+             + risk_cons * _param(params, "weight:consistency_factuality")
+             + risk_orig * _param(params, "weight:originality_anomaly")
+             + risk_vague * _param(params, "weight:vagueness_detail"))
+    scores = round_one_decimal(np.maximum(0.0, 10 - total * 10))
+    return np.where(col["empty_text"] == 1, 0.0, scores)
+
+
+def scores_to_levels(scores):
+    return np.where(scores >= LOW_RISK_MIN_SCORE, 0, np.where(scores >= MEDIUM_RISK_MIN_SCORE, 1, 2))
+
+
+def feedback_targets(store, item_ids):
+    target = np.full(len(item_ids), -1)
+    avoid = np.full(len(item_ids), -1)
+    position = {item_id: i for i, item_id in enumerate(item_ids.tolist())}
+    for feedback in store.iter_feedback():
+        i = position.get(feedback["item_id"])
+        if i is None:
+            continue
+        level = LEVELS.index(feedback["risk_level"]) if feedback["risk_level"] in LEVELS else -1
+        if feedback["verdict"] == "accurate":
+            target[i] = level
+        elif feedback["verdict"] == "inaccurate":
+            avoid[i] = level
+        elif feedback["verdict"] == "suspicious":
+            target[i] = LEVELS.index("high")
+    return target, avoid
+
+
+def agreement(levels, target, avoid):
+    labeled = (target >= 0) | (avoid >= 0)
+    if not labeled.any():
+        return np.zeros(levels.shape[0])
+    satisfied = np.where(target >= 0, levels == target, levels != avoid)
+    return (satisfied & labeled).sum(axis=1) / labeled.sum()
+
+
+def grid_search(features, target, avoid, param_grid, base_params, block_size=256, top=10):
+    names = list(param_grid)
+    combos = list(itertools.product(*(param_grid[name] for name in names)))
+    base_scores = rescore(features, base_params)[0]
+    results = []
+    for start in range(0, len(combos), block_size):
+        block = np.asarray(combos[start:start + block_size], dtype=np.float64)
+        params = {name: np.full(len(block), value, dtype=np.float64) for name, value in base_params.items()}
+        for j, name in enumerate(names):
+            params[name] = block[:, j]
+        scores = rescore(features, params)
+        objective = agreement(scores_to_levels(scores), target, avoid)
+        drift = np.abs(scores - base_scores).mean(axis=1)
+        for row, combo in enumerate(block):
+            results.append((float(objective[row]), float(drift[row]), dict(zip(names, combo.tolist()))))
+    results.sort(key=lambda result: (-result[0], result[1]))
+    return results[:top]
+
+
+def collect_features(evaluator, items):
+    feature_store = FeatureStore()
+    for item in items:
+        result = evaluator.assess(
+            item_text=item.get("item_text", ""),
+            item_metadata=item.get("item_metadata"),
+            historical_texts=item.get("historical_texts"),
+            similar_item_texts=item.get("similar_item_texts"),
+            item_id=item.get("id"),
+            return_features=True,
+        )
+        feature_store.append(item.get("id"), result)
+    return feature_store
+
+
+if __name__ == "__main__":
+    from product_store import ProductStore, DEFAULT_DB_PATH
+    from text_risk_evaluator import TextRiskEvaluator
+
+    parser = argparse.ArgumentParser(description="基于特征库的权重/阈值快速调参")
+    parser.add_argument("command", choices=["collect", "search"])
+    parser.add_argument("features", help="特征库文件 (.npz)")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help="产品数据库路径（读取物品和审核反馈）")
+    args = parser.parse_args()
+
+    evaluator = TextRiskEvaluator()
+    with ProductStore(args.db) as store:
+        if args.command == "collect":
+            feature_store = collect_features(evaluator, store.iter_items())
+            feature_store.save(args.features)
+            print(f"已保存 {len(feature_store)} 个物品的特征到 {args.features}")
+        else:
+            features = load_features(args.features)
+            base_params = params_from_evaluator(evaluator)
+            mismatched = int((rescore(features, base_params)[0] != features["overall_score"]).sum())
+            if mismatched:
+                print(f"警告：{mismatched} 个物品的重算评分与原始评分不一致，特征库可能来自不同配置。")
+            target, avoid = feedback_targets(store, features["item_ids"])
+            print(f"共 {len(features['item_ids'])} 个物品，其中 {int(((target >= 0) | (avoid >= 0)).sum())} 个有审核反馈。")
+            for objective, drift, params in grid_search(features, target, avoid, DEFAULT_GRID, base_params):
+                print(f"  一致率 {objective:.2%}  平均评分变化 {drift:.2f}  {params}")
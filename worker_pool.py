@@ -0,0 +1,257 @@
+import gc
+import multiprocessing
+import os
+import threading
+from multiprocessing.connection import wait
+
+from batch_runner import assess_item
+
+DRAIN_TIMEOUT = 30.0
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+WARM_UP_ITEM = {
+    "id": None,
+    "name": "预热",
+    "item_text": "预热文本：这款耳机续航长达20小时，读取速度 500MB/s，售价 $99。Amazing sound, great value.",
+    "item_metadata": {"category": "Electronics", "price": 99, "specs": {"color": "黑色"}},
+    "historical_texts": ["预热文本的上一版本"],
+    "similar_item_texts": ["另一款耳机的描述文本"],
+}
+# gc.freeze 作用于整个进程，多个进程池同时存在时只在最后一个关闭后才 unfreeze
+_freeze_lock = threading.Lock()
+_freeze_count = 0
+
+
+def _freeze():
+    global _freeze_count
+    with _freeze_lock:
+        gc.collect()
+        gc.freeze()
+        _freeze_count += 1
+
+
+def _unfreeze():
+    global _freeze_count
+    with _freeze_lock:
+        _freeze_count -= 1
+        if _freeze_count == 0:
+            gc.unfreeze()
+
+
+def read_rss_bytes(pid="self"):
+    try:
+        with open(f"/proc/{pid}/statm", "r") as f:
+            return int(f.read().split()[1]) * PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+def read_pss_bytes(pid="self"):
+    try:
+        with open(f"/proc/{pid}/smaps_rollup", "r") as f:
+            for line in f:
+                if line.startswith("Pss:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def _worker_main(evaluator, conn, max_tasks, max_rss_bytes):
+    tasks_done = 0
+    while True:
+        try:
+            message = conn.recv()
+        except EOFError:
+            break
+        if message is None:
+            break
+        task_id, item = message
+        row = assess_item(evaluator, item)
+        tasks_done += 1
+        rss = read_rss_bytes()
+        retire = tasks_done >= max_tasks or (max_rss_bytes is not None and rss is not None and rss > max_rss_bytes)
+        conn.send((task_id, row, retire, rss))
+        if retire:
+            break
+    conn.close()
+
+
+class _Worker:
+
+    def __init__(self, context, evaluator, max_tasks, max_rss_bytes):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(evaluator, child_conn, max_tasks, max_rss_bytes),
+                                       daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.task = None
+        self.tasks_done = 0
+
+    @property
+    def pid(self):
+        return self.process.pid
+
+    def send(self, task_id, item):
+        self.task = (task_id, item)
+        self.conn.send((task_id, item))
+
+    def stop(self, timeout=5):
+        try:
+            self.conn.send(None)
+        except (OSError, BrokenPipeError):
+            pass
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join()
+        self.conn.close()
+
+
+class WarmWorkerPool:
+
+    def __init__(self, evaluator, processes=None, max_tasks_per_worker=1000, max_rss_mb=None, warm_up=True):
+        if "fork" not in multiprocessing.get_all_start_methods():
+            raise RuntimeError("预热进程池需要 fork 启动方式，当前平台不支持")
+        self.evaluator = evaluator
+        self.processes = processes or os.cpu_count() or 1
+        self.max_tasks_per_worker = max_tasks_per_worker
+        self.max_rss_bytes = max_rss_mb * 1024 * 1024 if max_rss_mb else None
+        self.restarts = 0
+        self._context = multiprocessing.get_context("fork")
+        self._workers = []
+        self._next_task_id = 0
+        self._frozen = False
+
+        if warm_up:
+            evaluator.assess(**{key: value for key, value in WARM_UP_ITEM.items() if key not in ("id", "name")})
+        _freeze()
+        self._frozen = True
+        try:
+            for _ in range(self.processes):
+                self._workers.append(self._spawn())
+        except BaseException:
+            self.close()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _spawn(self):
+        return _Worker(self._context, self.evaluator, self.max_tasks_per_worker, self.max_rss_bytes)
+
+    def _replace(self, worker):
+        worker.stop()
+        self._workers[self._workers.index(worker)] = replacement = self._spawn()
+        self.restarts += 1
+        return replacement
+
+    def _drain(self, worker):
+        retire = True
+        if worker.conn.poll(DRAIN_TIMEOUT):
+            try:
+                _, _, retire, _ = worker.conn.recv()
+            except (EOFError, OSError):
+                pass
+        worker.task = None
+        if retire:
+            self._replace(worker)
+
+    def imap_unordered(self, items, max_attempts=2):
+        iterator = iter(items)
+        pending = []
+        attempts = {}
+        idle = list(self._workers)
+        busy = {}
+        sent = set()
+        exhausted = False
+
+        try:
+            while True:
+                while idle and (pending or not exhausted):
+                    if pending:
+                        task_id, item = pending.pop()
+                    else:
+                        try:
+                            item = next(iterator)
+                        except StopIteration:
+                            exhausted = True
+                            break
+                        task_id = self._next_task_id
+                        self._next_task_id += 1
+                    worker = idle.pop()
+                    try:
+                        worker.send(task_id, item)
+                    except OSError:
+                        pending.append((task_id, item))
+                        idle.append(self._replace(worker))
+                        continue
+                    sent.add(task_id)
+                    busy[worker.conn] = worker
+                if not busy:
+                    break
+
+                for conn in wait(list(busy)):
+                    worker = busy.pop(conn)
+                    try:
+                        task_id, row, retire, _ = conn.recv()
+                    except (EOFError, OSError):
+                        task_id, item = worker.task
+                        sent.discard(task_id)
+                        pid = worker.pid
+                        idle.append(self._replace(worker))
+                        attempts[task_id] = attempts.get(task_id, 0) + 1
+                        if attempts[task_id] < max_attempts:
+                            pending.append((task_id, item))
+                        else:
+                            print(f"错误：工作进程 {pid} 在评估物品 '{item.get('name')}' 时退出")
+                            yield task_id, {"id": item.get("id"), "name": item.get("name"), "overall_score": 0,
+                                            "dimension_risks": {}, "risk_labels": ["评估出错: 工作进程异常退出"],
+                                            "raw_sentiment": None, "risk_level": "high"}
+                        continue
+                    if task_id not in sent:
+                        # 不是本次调用发出的任务（上一次调用遗留的回复），丢弃并继续等这个工作进程
+                        busy[conn] = worker
+                        continue
+                    sent.discard(task_id)
+                    worker.task = None
+                    worker.tasks_done += 1
+                    idle.append(self._replace(worker) if retire else worker)
+                    yield task_id, row
+        finally:
+            # 调用方提前停止迭代时，正在评估的工作进程的回复还留在管道里，读掉后再交给下一次调用，
+            # 否则下一次调用会把这些旧回复当成自己的结果
+            for worker in list(busy.values()):
+                self._drain(worker)
+
+    def imap(self, items):
+        buffered = {}
+        next_index = self._next_task_id
+        for task_id, row in self.imap_unordered(items):
+            buffered[task_id] = row
+            while next_index in buffered:
+                yield buffered.pop(next_index)
+                next_index += 1
+
+    def map(self, items):
+        items = list(items)
+        first_task_id = self._next_task_id
+        results = [None] * len(items)
+        for task_id, row in self.imap_unordered(items):
+            results[task_id - first_task_id] = row
+        return results
+
+    def worker_stats(self):
+        return [{"pid": worker.pid, "tasks_done": worker.tasks_done,
+                 "rss_bytes": read_rss_bytes(worker.pid), "pss_bytes": read_pss_bytes(worker.pid)}
+                for worker in self._workers]
+
+    def close(self):
+        for worker in self._workers:
+            worker.stop()
+        self._workers = []
+        if self._frozen:
+            self._frozen = False
+            _unfreeze()